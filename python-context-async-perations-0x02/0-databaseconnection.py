@@ -1,4 +1,14 @@
+import queue
 import sqlite3
+import threading
+
+# Pragmas applied once to every new pooled connection
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # 16 MB page cache (negative means KiB)
+    'mmap_size': 268435456,     # memory-map up to 256 MB of the file
+}
 
 class DatabaseConnection:
     """A context manager for managing SQLite database connections."""
@@ -18,13 +28,140 @@ class DatabaseConnection:
     def __exit__(self, exc_type, exc_val, exc_tb):
         print("Closing database connection...")
         if self.conn:
-            self.conn.commit()
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()  # don't commit half of a failed block
             self.conn.close()
 
+class ConnectionPool:
+    """A thread-safe pool of SQLite connections to one database."""
+
+    """Initializes the pool; connections are opened lazily, up to max_size."""
+    def __init__(self, db_name, max_size=5, pragmas=None, timeout=30.0):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._borrowed = 0
+
+    """Opens a physical connection and applies the pragmas to it once."""
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    """Borrows an idle connection, opens a new one, or waits for one."""
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._open < self.max_size
+                if create:
+                    self._open += 1  # reserve the slot before connecting
+            if create:
+                try:
+                    conn = self._connect()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No connection free within {self.timeout}s")
+        with self._lock:
+            self._borrowed += 1
+        return conn
+
+    """Returns a connection, rolling back anything left uncommitted."""
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._open -= 1
+                self._borrowed -= 1
+            return
+        with self._lock:
+            self._borrowed -= 1
+        self._idle.put(conn)
+
+    """Open, borrowed and idle connection counts."""
+    def gauges(self):
+        with self._lock:
+            return {'open': self._open, 'borrowed': self._borrowed,
+                    'idle': self._open - self._borrowed}
+
+    """Closes every idle connection."""
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._open -= 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_name, **options):
+    """Returns the shared pool for db_name, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = _pools[db_name] = ConnectionPool(db_name, **options)
+        return pool
+
+class PooledDatabaseConnection:
+    """DatabaseConnection that borrows from a ConnectionPool instead of
+    opening and closing a connection on every 'with' block."""
+
+    """Initializes with a database name (uses its shared pool) or a pool."""
+    def __init__(self, db_name=None, pool=None):
+        self.pool = pool if pool is not None else get_pool(db_name)
+        self.conn = None
+        self.cursor = None
+    """Borrows a connection and returns a cursor on it."""
+    def __enter__(self):
+        self.conn = self.pool.acquire()
+        self.cursor = self.conn.cursor()
+        return self.cursor
+    """Commits, or rolls back on exception, then returns the connection."""
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.cursor.close()
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.pool.release(self.conn)
+            self.conn = self.cursor = None
+
 # ==== Usage ====
 
-with DatabaseConnection('Alx_prodev.db') as cursor:
-    cursor.execute("SELECT * FROM users")
-    results = cursor.fetchall()
-    for row in results:
-        print(row)
+if __name__ == "__main__":
+    with DatabaseConnection('Alx_prodev.db') as cursor:
+        cursor.execute("SELECT * FROM users")
+        results = cursor.fetchall()
+        for row in results:
+            print(row)
+
+    # Repeated blocks reuse one pooled connection
+    for _ in range(3):
+        with PooledDatabaseConnection('Alx_prodev.db') as cursor:
+            cursor.execute("SELECT COUNT(*) FROM users")
+            print(cursor.fetchone())
+    print(get_pool('Alx_prodev.db').gauges())
@@ -3,11 +3,23 @@ import sqlite3
 class ExecuteQuery:
     """A context manager for executing a query on an SQLite database."""
 
-    """Initializes the ExecuteQuery with the database name, query, and parameters."""
-    def __init__(self, db_name, query, params=()):
+    """
+    Initializes the ExecuteQuery with the database name, query, and parameters.
+
+    stream=True makes the 'with' block get a lazy iterator over the rows,
+    read arraysize rows at a time with fetchmany, instead of a fetchall()
+    list; the connection stays open until the block ends. many=True runs
+    executemany with params as a sequence of parameter sets and gives the
+    block the number of affected rows.
+    """
+    def __init__(self, db_name, query, params=(), stream=False,
+                 arraysize=1000, many=False):
         self.db_name = db_name
         self.query = query
         self.params = params
+        self.stream = stream
+        self.arraysize = arraysize
+        self.many = many
         self.conn = None
         self.cursor = None
         self.result = None
@@ -17,21 +29,44 @@ class ExecuteQuery:
         print("Opening connection and executing query...")
         self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
-        self.cursor.execute(self.query, self.params)
-        self.result = self.cursor.fetchall()
+        self.cursor.arraysize = self.arraysize
+        if self.many:
+            self.cursor.executemany(self.query, self.params)
+            self.result = self.cursor.rowcount
+        else:
+            self.cursor.execute(self.query, self.params)
+            self.result = self._rows() if self.stream else self.cursor.fetchall()
         return self.result
 
+    """Yields rows, reading them from the cursor one arraysize batch at a time."""
+    def _rows(self):
+        while True:
+            rows = self.cursor.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
     """The end of the 'with' block to close the database connection."""
     def __exit__(self, exc_type, exc_val, exc_tb):
         print("Closing connection...")
         if self.conn:
-            self.conn.commit()
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
             self.conn.close()
 
 # Using the context manager to fetch users older than 25
 query = "SELECT * FROM users WHERE age > ?"
 params = (25,)
 
-with ExecuteQuery("Alx_prodev.db", query, params) as results:
-    for row in results:
-        print(row)
+if __name__ == "__main__":
+    with ExecuteQuery("Alx_prodev.db", query, params) as results:
+        for row in results:
+            print(row)
+
+    # Same query, rows streamed instead of loaded all at once
+    with ExecuteQuery("Alx_prodev.db", query, params, stream=True,
+                      arraysize=500) as rows:
+        for row in rows:
+            print(row)
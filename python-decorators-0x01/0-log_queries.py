@@ -1,25 +1,227 @@
+import re
+import sys
+import atexit
+import json
+import time
+import random
 import sqlite3
+import inspect
 import functools
+import threading
+from collections import deque
 from datetime import datetime
 
 #### decorator to lof SQL queries
 
 """ Decorator to log SQL queries executed by a function."""
 
-def log_queries(func):
+# Literals and whitespace folded away when fingerprinting a query
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_PUNCT = re.compile(r"\s*([=<>!,()]+)\s*")
+
+def fingerprint(query):
+    """
+    Normalizes a query so calls that differ only in literal values share
+    one fingerprint: literals become ?, IN lists collapse to (?+),
+    whitespace and case are folded and spaces around operators and
+    punctuation are dropped (name='x' and name = 'y' both give name=?).
+    """
+    if not query:
+        return None
+    query = _STRING.sub('?', query)
+    query = _NUMBER.sub('?', query)
+    query = _IN_LIST.sub('(?+)', query)
+    query = _SPACE.sub(' ', query)
+    return _PUNCT.sub(r'\1', query).strip().lower()
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+# In-process sink for query records
+class QueryLog:
+    """
+    Collects query records without writing on the caller's thread.
+
+    Every call is timed into a per-fingerprint window of recent durations
+    (for p50/p95/p99). A sample_rate fraction of calls, plus every call
+    slower than slow_ms, is also kept as a record in a ring buffer of
+    `capacity` entries; a daemon thread writes the buffered records as
+    JSON lines to `stream` every flush_interval seconds. When the buffer
+    is full the oldest records are dropped and counted.
+    """
+    def __init__(self, capacity=10_000, sample_rate=1.0, slow_ms=100.0,
+                 redact=True, flush_interval=1.0, stream=None, window=1024):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.redact = redact
+        self.flush_interval = flush_interval
+        self.stream = stream
+        self.window = window
+        self._buffer = deque(maxlen=capacity)
+        self._timings = {}  # fingerprint -> deque of recent durations (ms)
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+        self.stats = {'calls': 0, 'recorded': 0, 'slow': 0, 'dropped': 0,
+                      'flushed': 0}
+
+    def observe(self, query, params, elapsed_ms, rows, caller, error=None):
+        """Times one call and keeps a record if it is sampled or slow."""
+        key = fingerprint(query)
+        slow = self.slow_ms is not None and elapsed_ms >= self.slow_ms
+        sampled = slow or random.random() < self.sample_rate
+        with self._lock:
+            self.stats['calls'] += 1
+            timings = self._timings.get(key)
+            if timings is None:
+                timings = self._timings[key] = deque(maxlen=self.window)
+            timings.append(elapsed_ms)
+            if not sampled:
+                return
+            if slow:
+                self.stats['slow'] += 1
+            if len(self._buffer) == self._buffer.maxlen:
+                self.stats['dropped'] += 1
+            self.stats['recorded'] += 1
+            self._buffer.append({
+                'ts': datetime.now().isoformat(timespec='milliseconds'),
+                'fingerprint': key,
+                'params': self._params(params),
+                'ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'caller': caller,
+                'slow': slow,
+                'error': error,
+            })
+        self._start_flusher()
+
+    def _params(self, params):
+        if self.redact:
+            return ['?'] * len(params)
+        return [repr(value) for value in params]
+
+    def _start_flusher(self):
+        if self._flusher is not None or self.flush_interval is None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run, daemon=True)
+        self._flusher.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def drain(self):
+        """Removes and returns every buffered record."""
+        with self._lock:
+            records = list(self._buffer)
+            self._buffer.clear()
+        return records
+
+    def flush(self):
+        """Writes buffered records as JSON lines in a single write."""
+        records = self.drain()
+        if not records:
+            return 0
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(''.join(json.dumps(record) + '\n'
+                             for record in records))
+        stream.flush()
+        with self._lock:
+            self.stats['flushed'] += len(records)
+        return len(records)
+
+    def close(self):
+        """Stops the flusher and writes whatever is still buffered."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def percentiles(self):
+        """p50/p95/p99 (ms) and call count per fingerprint."""
+        with self._lock:
+            windows = {key: sorted(timings)
+                       for key, timings in self._timings.items()}
+        return {key: {'count': len(ordered),
+                      'p50': _percentile(ordered, 0.50),
+                      'p95': _percentile(ordered, 0.95),
+                      'p99': _percentile(ordered, 0.99)}
+                for key, ordered in windows.items()}
+
+query_log = QueryLog()
+
+# Write out records still buffered when the interpreter exits
+atexit.register(query_log.close)
+
+def _split_call(args, kwargs):
+   # The query is kwargs['query'] or the first argument; the rest are params
+   if 'query' in kwargs:
+      params = list(args) + [value for name, value in kwargs.items()
+                             if name != 'query']
+      return kwargs['query'], params
+   if args:
+      return args[0], list(args[1:]) + list(kwargs.values())
+   return None, list(kwargs.values())
+
+def _count_rows(result):
+   # A list is a row set (fetchall); a tuple is one row (fetchone)
+   if isinstance(result, list):
+      return len(result)
+   return 0 if result is None else 1
+
+def _caller(depth=2):
+   # File and line that called the decorated function
+   frame = sys._getframe(depth)
+   return f"{frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno}"
+
+def log_queries(func=None, *, log=None):
+   # Allow both @log_queries and @log_queries(log=QueryLog(...))
+   if func is None:
+      return lambda f: log_queries(f, log=log)
+   log = query_log if log is None else log
+
+   # Coroutine functions get an async wrapper so they stay awaitable
+   if inspect.iscoroutinefunction(func):
+      @functools.wraps(func)
+      async def async_wrapper(*args, **kwargs):
+         caller = _caller()
+         start = time.perf_counter()
+         result, error = None, None
+         try:
+            result = await func(*args, **kwargs)
+            return result
+         except Exception as e:
+            error = repr(e)
+            raise
+         finally:
+            query, params = _split_call(args, kwargs)
+            log.observe(query, params, (time.perf_counter() - start) * 1000,
+                        _count_rows(result), caller, error)
+      return async_wrapper
+
    @functools.wraps(func)
    def wrapper(*args, **kwargs):
-      # Check if 'query' is in kwargs or args
-      query = None
-      # If 'query' is in kwargs, use it; otherwise, check args  
-      if 'query' in kwargs:
-            query = kwargs['query']
-      elif args:
-         query = args[0]
-
-      print(f"Executing query: {query}")
-      return func(*args, **kwargs)
-   return wrapper  
+      caller = _caller()
+      start = time.perf_counter()
+      result, error = None, None
+      try:
+         result = func(*args, **kwargs)
+         return result
+      except Exception as e:
+         error = repr(e)
+         raise
+      finally:
+         query, params = _split_call(args, kwargs)
+         log.observe(query, params, (time.perf_counter() - start) * 1000,
+                     _count_rows(result), caller, error)
+   return wrapper
 
 @log_queries
 def fetch_all_users(query):
@@ -30,5 +232,10 @@ def fetch_all_users(query):
     conn.close()
     return results
 
-#### fetch users while logging the query
-users = fetch_all_users(query="SELECT * FROM users")
+if __name__ == "__main__":
+    #### fetch users while logging the query
+    users = fetch_all_users(query="SELECT * FROM users")
+    for _ in range(100):
+        fetch_all_users("SELECT * FROM users WHERE id = 1")
+    query_log.close()
+    print(query_log.percentiles(), query_log.stats)
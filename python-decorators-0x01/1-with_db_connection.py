@@ -1,12 +1,130 @@
-import sqlite3 
+import sqlite3
+import inspect
 import functools
+import queue
+import threading
 from datetime import datetime
 
+# Pragmas applied once to every new pooled connection
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+}
+
+# Pool of reusable SQLite connections
+class SQLitePool:
+    """
+    Reuses SQLite connections instead of opening one per call.
+
+    thread_local=True keeps one connection per thread. Otherwise up to
+    `size` connections are shared through a queue and borrowers wait when
+    all of them are in use, raising TimeoutError after `timeout` seconds
+    (e.g. when pooled functions call each other more than `size` deep).
+    Pragmas run once, when a connection is made.
+    """
+    def __init__(self, database='users.db', size=5, pragmas=None,
+                 thread_local=False, timeout=30.0):
+        self.database = database
+        self.size = size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.thread_local = thread_local
+        self.timeout = timeout
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database,
+                               check_same_thread=self.thread_local)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        if self.thread_local:
+            conn = getattr(self._local, 'conn', None)
+            with self._lock:
+                if conn is None:
+                    self.misses += 1
+                    self._created += 1
+                else:
+                    self.hits += 1
+            if conn is None:
+                conn = self._local.conn = self._connect()
+            return conn
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.hits += 1
+            return conn
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+                self.misses += 1
+        if create:
+            return self._connect()
+        try:
+            # every connection is busy; wait for one
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No pooled connection free within {self.timeout}s")
+        with self._lock:
+            self.hits += 1
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if not self.thread_local:
+            self._idle.put(conn)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'connections': self._created}
+
 # Decorator to handle database connection
-def with_db_connection(func):
+def with_db_connection(func=None, *, pool=None):
+    # Allow both @with_db_connection and @with_db_connection(pool=...)
+    if func is None:
+        return lambda f: with_db_connection(f, pool=pool)
+
+    # Coroutine functions get an aiosqlite connection and stay awaitable
+    if inspect.iscoroutinefunction(func):
+        if pool is not None:
+            raise TypeError("SQLitePool holds sqlite3 connections; "
+                            "it cannot be used with async functions")
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            import aiosqlite  # only needed by async callers
+            conn = await aiosqlite.connect('users.db')
+            try:
+                result = await func(conn, *args, **kwargs)
+                await conn.commit()
+                return result
+            except Exception as e:
+                print(f"[LOG] An error occurred: {e}")
+                await conn.rollback()
+            finally:
+                await conn.close()
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')  # Open the database connection
+        if pool is None:
+            conn = sqlite3.connect('users.db')  # Open the database connection
+        else:
+            conn = pool.acquire()  # Borrow a pooled connection
         try:
             result = func(conn, *args, **kwargs)
             conn.commit()
@@ -15,16 +133,38 @@ def with_db_connection(func):
             print(f"[LOG] An error occurred: {e}")
             conn.rollback()
         finally:
-            conn.close() # Close the connection
+            if pool is None:
+                conn.close() # Close the connection
+            else:
+                pool.release(conn) # Hand it back to the pool
     return wrapper
 
-@with_db_connection 
-def get_user_by_id(conn, user_id): 
-    cursor = conn.cursor() 
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,)) 
+@with_db_connection
+def get_user_by_id(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+pool = SQLitePool('users.db')
+
+@with_db_connection(pool=pool)
+def get_user_by_id_pooled(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
     return cursor.fetchone()
- 
-#### Fetch user by ID with automatic connection handling 
 
-user = get_user_by_id(user_id=1)
-print(user)
+@with_db_connection
+async def async_get_user_by_id(conn, user_id):
+    async with conn.execute("SELECT * FROM users WHERE id = ?",
+                            (user_id,)) as cursor:
+        return await cursor.fetchone()
+
+if __name__ == "__main__":
+    #### Fetch user by ID with automatic connection handling
+
+    user = get_user_by_id(user_id=1)
+    print(user)
+
+    #### Same query through the pool; the second call reuses the connection
+    get_user_by_id_pooled(user_id=1)
+    print(get_user_by_id_pooled(user_id=1), pool.stats())
@@ -1,5 +1,8 @@
+import time
 import sqlite3 
+import inspect
 import functools
+import threading
 from datetime import datetime
 
 # Decorator to handle database connection
@@ -18,27 +21,229 @@ def with_db_connection(func):
             conn.close() # Close the connection
     return wrapper
 
+# Callbacks run after each commit with the set of tables that were written,
+# or None when the tables are unknown (async connections have no authorizer)
+commit_listeners = []
+
+# SQLite authorizer actions that modify a table
+WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE,
+                 sqlite3.SQLITE_DELETE}
+
+# Open transaction scopes per connection: id(conn) -> _Scope
+_scopes = {}
+_scopes_lock = threading.Lock()
+
+class _Scope:
+    def __init__(self):
+        self.depth = 0  # open @transactional calls on the connection
+        self.written = set()
+        self.group = None  # the group_commit batching this connection
+
+def _enter_scope(conn):
+    with _scopes_lock:
+        scope = _scopes.get(id(conn))
+        if scope is None:
+            scope = _scopes[id(conn)] = _Scope()
+        scope.depth += 1
+        return scope
+
+def _exit_scope(conn, scope):
+    with _scopes_lock:
+        scope.depth -= 1
+        if not scope.depth and scope.group is None:
+            del _scopes[id(conn)]
+
+def _notify(written):
+    for listener in commit_listeners:
+        listener(written)
+
+def _commit(conn, scope):
+    conn.commit()
+    written = set(scope.written)
+    scope.written.clear()  # the authorizer keeps adding to this same set
+    _notify(written)
+
+# Batches many @transactional calls into one commit
+class group_commit:
+    """
+    Context manager that turns each @transactional call on `conn` into a
+    SAVEPOINT inside one shared transaction, committed every `every`
+    calls, after `max_delay` seconds, and on exit. A failing call only
+    rolls back its own savepoint. An exception escaping the block rolls
+    back whatever has not been committed yet.
+    """
+    def __init__(self, conn, every=100, max_delay=None, immediate=False):
+        self.conn = conn
+        self.every = every
+        self.max_delay = max_delay
+        self.immediate = immediate
+        self.pending = 0
+        self.commits = 0
+        self._started = None
+
+    def __enter__(self):
+        self.scope = _enter_scope(self.conn)
+        self.scope.group = self
+        self._begin()
+        self.conn.set_authorizer(_authorizer(self.scope.written))
+        return self
+
+    def _begin(self):
+        # Open the shared transaction now; otherwise each call's SAVEPOINT
+        # would start (and its RELEASE commit) a transaction of its own
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+        self._started = time.monotonic()
+
+    def written(self):
+        """Called after each successful call in the batch."""
+        self.pending += 1
+        if (self.pending >= self.every or self.max_delay is not None
+                and time.monotonic() - self._started >= self.max_delay):
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            _commit(self.conn, self.scope)
+            self.commits += 1
+            self.pending = 0
+            # Re-setting the authorizer makes SQLite re-prepare cached
+            # statements, so it sees the next batch's writes too
+            self.conn.set_authorizer(_authorizer(self.scope.written))
+        self._begin()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                if self.pending:
+                    _commit(self.conn, self.scope)
+                    self.commits += 1
+                elif self.conn.in_transaction:
+                    self.conn.commit()  # just ends an empty BEGIN
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.set_authorizer(None)
+            self.scope.group = None
+            _exit_scope(self.conn, self.scope)
+        return False
+
+def _authorizer(written):
+    # Record every table the transaction writes to
+    def authorizer(action, table, *_):
+        if action in WRITE_ACTIONS and table:
+            written.add(table.lower())
+        return sqlite3.SQLITE_OK
+    return authorizer
+
 # Decorator to handle transactions
-def transactional(func):
+def transactional(func=None, *, immediate=False):
+    """
+    Runs func in a transaction on its connection (the first argument) and
+    commits it. A @transactional call made while another is open on the
+    same connection, or inside group_commit, becomes a SAVEPOINT instead:
+    its failure rolls back only its own writes. immediate=True opens the
+    outermost transaction with BEGIN IMMEDIATE, taking SQLite's write
+    lock up front. Without it, two readers that both try to upgrade to
+    writers can deadlock, and one of them fails with "database is locked".
+    """
+    # Allow both @transactional and @transactional(immediate=True)
+    if func is None:
+        return lambda f: transactional(f, immediate=immediate)
+
+    # Coroutine functions commit and roll back through the async connection
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            conn = args[0]  # Assuming the first argument is an aiosqlite connection
+            scope = _enter_scope(conn)
+            savepoint = f"sp_{scope.depth}" if scope.depth > 1 else None
+            try:
+                if savepoint:
+                    await conn.execute(f"SAVEPOINT {savepoint}")
+                elif not conn.in_transaction:
+                    await conn.execute("BEGIN IMMEDIATE" if immediate
+                                       else "BEGIN")
+                result = await func(*args, **kwargs)
+                if savepoint:
+                    await conn.execute(f"RELEASE {savepoint}")
+                else:
+                    await conn.commit()
+                    print("[LOG] Transaction committed.")
+                    _notify(None)
+                return result
+            except Exception as e:
+                print(f"[ERROR] An error occurred: {e}")
+                if savepoint:
+                    await conn.execute(f"ROLLBACK TO {savepoint}")
+                    await conn.execute(f"RELEASE {savepoint}")
+                else:
+                    await conn.rollback()
+            finally:
+                _exit_scope(conn, scope)
+            return None
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         conn = args[0]  # Assuming the first argument is the connection
+        scope = _enter_scope(conn)
+        outermost = scope.depth == 1
+        savepoint = None if outermost else f"sp_{scope.depth}"
         try:
+            if savepoint:
+                conn.execute(f"SAVEPOINT {savepoint}")
+            else:
+                # Begin explicitly, so a nested call made before the first
+                # write is a savepoint inside this transaction, not its own
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                conn.set_authorizer(_authorizer(scope.written))
             result = func(*args, **kwargs)
-            conn.commit() # Commit the transaction if successful    
-            print("[LOG] Transaction committed.")
+            if savepoint:
+                conn.execute(f"RELEASE {savepoint}")
+                if scope.group is not None and scope.depth == 2:
+                    scope.group.written()
+            else:
+                _commit(conn, scope) # Commit the transaction if successful
+                print("[LOG] Transaction committed.")
             return result
         except Exception as e:
             print(f"[ERROR] An error occurred: {e}")
-            conn.rollback()
+            if savepoint:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.rollback()
+                scope.written.clear()
+        finally:
+            if outermost:
+                conn.set_authorizer(None)
+            _exit_scope(conn, scope)
         return None
     return wrapper
 
 @with_db_connection
-@transactional 
-def update_user_email(conn, user_id, new_email): 
-    cursor = conn.cursor() 
-    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id)) 
-#### Update user's email with automatic transaction handling 
+@transactional
+def update_user_email(conn, user_id, new_email):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+@with_db_connection
+def import_emails(conn, updates):
+    with group_commit(conn, every=100, immediate=True) as batch:
+        for user_id, new_email in updates:
+            set_user_email(conn, user_id, new_email)
+    print(f"[LOG] {len(updates)} updates in {batch.commits} commits.")
+
+@transactional
+def set_user_email(conn, user_id, new_email):
+    conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+if __name__ == "__main__":
+    #### Update user's email with automatic transaction handling
+
+    update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
 
-update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
+    #### Many small writes, one commit per 100 of them
+    import_emails([(1, 'Crawford_Cartwright@hotmail.com')] * 250)
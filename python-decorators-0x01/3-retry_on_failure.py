@@ -1,6 +1,10 @@
 import time
+import random
+import asyncio
 import sqlite3 
+import inspect
 import functools
+import threading
 from datetime import datetime
 
 # Decorator to handle database connection
@@ -19,20 +23,137 @@ def with_db_connection(func):
             conn.close() # Close the connection
     return wrapper
 
+# SQLite errors that clear up on their own when retried
+TRANSIENT_MESSAGES = ('database is locked', 'database table is locked',
+                      'database schema has changed')
+
+def is_transient(error):
+    """True for lock/busy errors worth retrying; False for everything else."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in TRANSIENT_MESSAGES)
+
+# Process-wide cap on retries
+class RetryBudget:
+    """
+    Token bucket shared by every retrying call. Each call deposits `ratio`
+    tokens and each retry spends one, so under load retries stay at
+    roughly `ratio` of the call rate. The bucket starts with min_tokens
+    and also refills at min_per_second tokens a second, so a quiet process
+    that used up its budget still gets about that many retries a second.
+    When the database is down the bucket empties and calls fail fast
+    instead of piling retries onto it.
+    """
+    def __init__(self, ratio=0.2, min_tokens=10, max_tokens=100,
+                 min_per_second=1.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.min_per_second = min_per_second
+        self._tokens = float(min_tokens)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens
+                           + (now - self._refilled) * self.min_per_second)
+        self._refilled = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+retry_budget = RetryBudget()
+
+# Attempt and give-up counters for every retry_on_failure wrapper
+retry_stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'successes': 0,
+               'give_ups': 0, 'not_retryable': 0, 'budget_exhausted': 0}
+_stats_lock = threading.Lock()
+
+def _count(name):
+    with _stats_lock:
+        retry_stats[name] += 1
+
+def _backoff(attempt, delay, max_delay):
+    # Full jitter: anywhere between 0 and the exponential ceiling
+    return random.uniform(0, min(max_delay, delay * 2 ** attempt))
+
+def _retry_delay(error, attempt, retries, delay, max_delay, retry_on, budget):
+    """Seconds to wait before the next attempt, or None to give up."""
+    print(f"[LOG] Attempt {attempt + 1} failed: {error}")
+    if not retry_on(error):
+        _count('not_retryable')
+        return None
+    if attempt >= retries - 1:
+        _count('give_ups')
+        return None
+    if budget is not None and not budget.withdraw():
+        _count('budget_exhausted')
+        _count('give_ups')
+        return None
+    _count('retries')
+    return _backoff(attempt, delay, max_delay)
+
 # Decorator to handle retries on failure
-def retry_on_failure(retries=3, delay=1):
+def retry_on_failure(retries=3, delay=1, max_delay=30, retry_on=is_transient,
+                     budget=retry_budget):
+    """
+    Retries transient failures up to `retries` attempts in total, waiting
+    a random time up to delay * 2**attempt (capped at max_delay) between
+    them. Errors retry_on rejects, and errors once the attempts or the
+    shared budget run out, are raised unchanged.
+    """
     def decorator(func):
+        # Coroutine functions wait with asyncio.sleep so the loop keeps running
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                _count('calls')
+                if budget is not None:
+                    budget.deposit()
+                for attempt in range(retries):
+                    try:
+                        print(f"[LOG] Attempt {attempt}...")
+                        _count('attempts')
+                        result = await func(*args, **kwargs)
+                        _count('successes')
+                        return result
+                    except Exception as e:
+                        wait = _retry_delay(e, attempt, retries, delay,
+                                            max_delay, retry_on, budget)
+                        if wait is None:
+                            raise
+                    await asyncio.sleep(wait)
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            _count('calls')
+            if budget is not None:
+                budget.deposit()
             for attempt in range(retries):
                 try:
                     print(f"[LOG] Attempt {attempt}...")
-                    return func(*args, **kwargs)
+                    _count('attempts')
+                    result = func(*args, **kwargs)
+                    _count('successes')
+                    return result
                 except Exception as e:
-                    print(f"[LOG] Attempt {attempt + 1} failed: {e}")
-                    if attempt < retries - 1:
-                        time.sleep(delay)
-            raise Exception("All retry attempts failed.")
+                    wait = _retry_delay(e, attempt, retries, delay,
+                                        max_delay, retry_on, budget)
+                    if wait is None:
+                        raise
+                time.sleep(wait)
         return wrapper
     return decorator
 
@@ -44,7 +165,9 @@ def fetch_users_with_retry(conn):
     cursor.execute("SELECT * FROM users")
     return cursor.fetchall()
 
-#### attempt to fetch users with automatic retry on failure
+if __name__ == "__main__":
+    #### attempt to fetch users with automatic retry on failure
+
+    users = fetch_users_with_retry()
+    print(users, retry_stats)
 
-users = fetch_users_with_retry()
-print(users)
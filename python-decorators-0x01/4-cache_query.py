@@ -1,9 +1,256 @@
+import re
+import sys
 import time
-import sqlite3 
+import asyncio
+import sqlite3
+import inspect
 import functools
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
-query_cache = {}
+transactional_module = __import__('2-transactional')
+transactional = transactional_module.transactional
+
+# Tables a SELECT reads from, used to tag cache entries
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+
+# A computation in progress that other callers can wait on
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# Bounded LRU cache with TTL and table-tag invalidation
+class QueryCache:
+    """
+    LRU cache for query results, bounded by entry count and by the
+    approximate size of the cached rows in bytes. Entries can expire after
+    a TTL and are tagged with the tables they read, so a committed write
+    to a table drops every entry that depends on it.
+
+    Misses are single-flight: while one caller computes a key, others
+    asking for it wait for that result instead of querying too. Coroutine
+    callers get the same through acompute(), with one asyncio.Lock per key.
+    """
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024,
+                 default_ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (result, expires, tables, size)
+        self._tags = {}  # table -> set of keys
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._flights = {}  # key -> _Flight
+        self._async_locks = {}  # key -> [asyncio.Lock, users]
+        self._tasks = set()  # background async refreshes
+        self._generation = 0  # bumped by invalidation
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                      'expirations': 0, 'invalidations': 0, 'coalesced': 0,
+                      'stale_hits': 0, 'refreshes': 0}
+
+    @staticmethod
+    def size_of(result):
+        """Rough size of a result: the list, its rows and their values."""
+        size = sys.getsizeof(result)
+        if isinstance(result, (list, tuple)):
+            for row in result:
+                size += sys.getsizeof(row)
+                if isinstance(row, (list, tuple)):
+                    size += sum(sys.getsizeof(value) for value in row)
+        return size
+
+    def lookup(self, key, stale_for=0):
+        """
+        Returns ('fresh', result), ('stale', result) or ('miss', None).
+        An expired entry is 'stale' for stale_for seconds after its TTL,
+        then it is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return 'miss', None
+            result, expires, _, _ = entry
+            now = time.monotonic()
+            if expires is not None and now >= expires:
+                if now < expires + stale_for:
+                    self._entries.move_to_end(key)
+                    self.stats['stale_hits'] += 1
+                    return 'stale', result
+                self._remove(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return 'miss', None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return 'fresh', result
+
+    def get(self, key):
+        """Returns (True, result) on a fresh hit, else (False, None)."""
+        status, result = self.lookup(key)
+        return status == 'fresh', result
+
+    def compute(self, key, func, tables=(), ttl=None):
+        """
+        Runs func() and caches its result, unless another thread is
+        already computing key, in which case waits for and returns that.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func()
+            with self._lock:
+                # Don't cache rows read before a write invalidated them
+                if generation == self._generation:
+                    self.set(key, flight.result, tables, ttl)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def refresh(self, key, func, tables=(), ttl=None):
+        """Recomputes key on a background thread unless already running."""
+        with self._lock:
+            if key in self._flights:
+                return
+            self.stats['refreshes'] += 1
+
+        def run():
+            try:
+                self.compute(key, func, tables, ttl)
+            except Exception as e:
+                print(f"[LOG] Background refresh failed: {e}")
+        threading.Thread(target=run, daemon=True).start()
+
+    async def acompute(self, key, func, tables=(), ttl=None):
+        """
+        Awaits func() and caches its result. Coroutines missing on the same
+        key queue on that key's lock; once the first one has filled the
+        entry, the rest are served from the cache.
+        """
+        with self._lock:
+            holder = self._async_locks.get(key)
+            if holder is None:
+                holder = self._async_locks[key] = [asyncio.Lock(), 0]
+            holder[1] += 1
+        lock = holder[0]
+        try:
+            waited = lock.locked()
+            async with lock:
+                if waited:
+                    status, result = self.lookup(key)
+                    if status == 'fresh':
+                        with self._lock:
+                            self.stats['coalesced'] += 1
+                        return result
+                with self._lock:
+                    generation = self._generation
+                result = await func()
+                with self._lock:
+                    # Don't cache rows read before a write invalidated them
+                    if generation == self._generation:
+                        self.set(key, result, tables, ttl)
+                return result
+        finally:
+            with self._lock:
+                holder[1] -= 1
+                if not holder[1]:
+                    del self._async_locks[key]
+
+    def arefresh(self, key, func, tables=(), ttl=None):
+        """Recomputes key in a background task unless already running."""
+        with self._lock:
+            if key in self._async_locks:
+                return
+            self.stats['refreshes'] += 1
+
+        async def run():
+            try:
+                await self.acompute(key, func, tables, ttl)
+            except Exception as e:
+                print(f"[LOG] Background refresh failed: {e}")
+        task = asyncio.ensure_future(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def set(self, key, result, tables=(), ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = self.size_of(result)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return  # would evict everything else; just don't cache it
+            self._entries[key] = (result, expires, frozenset(tables), size)
+            self._bytes += size
+            for table in tables:
+                self._tags.setdefault(table, set()).add(key)
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def _remove(self, key):
+        _, _, tables, size = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._tags.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[table]
+
+    def invalidate_tables(self, tables):
+        """
+        Drops every entry that read from any of the given tables, or every
+        entry when tables is None (the writer could not tell which).
+        """
+        with self._lock:
+            self._generation += 1
+            if tables is None:
+                self.stats['invalidations'] += len(self._entries)
+                self.clear()
+                return
+            for table in tables:
+                for key in list(self._tags.get(table.lower(), ())):
+                    self._remove(key)
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries),
+                        bytes=self._bytes)
+
+query_cache = QueryCache()
+
+# Writes committed through @transactional invalidate the tables they touched
+transactional_module.commit_listeners.append(query_cache.invalidate_tables)
 
 # Decorator to handle database connection
 def with_db_connection(func):
@@ -22,20 +269,87 @@ def with_db_connection(func):
     return wrapper
 
 # Decorator to cache query results
-def cache_query(func):
+def cache_query(func=None, *, ttl=None, cache=None, stale_while_revalidate=0,
+                connect=lambda: sqlite3.connect('users.db'), aconnect=None):
+    # Allow both @cache_query and @cache_query(ttl=..., cache=...)
+    if func is None:
+        return lambda f: cache_query(
+            f, ttl=ttl, cache=cache,
+            stale_while_revalidate=stale_while_revalidate, connect=connect,
+            aconnect=aconnect)
+    cache = query_cache if cache is None else cache
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            query, key, tables = _cache_key(func, args, kwargs)
+            status, result = cache.lookup(key, stale_while_revalidate)
+            if status == 'fresh':
+                print("[LOG] Using cached result for query:", query)
+                return result
+            if status == 'stale':
+                print("[LOG] Using stale result, refreshing query:", query)
+                cache.arefresh(key, lambda: _arun_on_new_connection(
+                    func, aconnect, args[1:], kwargs), tables, ttl)
+                return result
+
+            async def run():
+                print("[LOG] Executing query:", query)
+                return await func(*args, **kwargs)
+            return await cache.acompute(key, run, tables, ttl)
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        query = kwargs.get('query', args[0] if args else None)
-        if query in query_cache:
+        query, key, tables = _cache_key(func, args, kwargs)
+        status, result = cache.lookup(key, stale_while_revalidate)
+        if status == 'fresh':
             print("[LOG] Using cached result for query:", query)
-            return query_cache[query]
-        
-        print("[LOG] Executing query:", query)
-        result = func(*args, **kwargs)
-        query_cache[query] = result
-        return result
+            return result
+        if status == 'stale':
+            # Serve the stale rows now and refresh on a new connection,
+            # since the caller's connection is closed once we return
+            print("[LOG] Using stale result, refreshing query:", query)
+            cache.refresh(key, lambda: _run_on_new_connection(
+                func, connect, args[1:], kwargs), tables, ttl)
+            return result
+
+        def run():
+            print("[LOG] Executing query:", query)
+            return func(*args, **kwargs)
+        return cache.compute(key, run, tables, ttl)
     return wrapper
 
+def _cache_key(func, args, kwargs):
+    # args[0] is the connection; the key is the query plus its params
+    params = dict(kwargs)
+    query = params.pop('query', None)
+    rest = args[1:]
+    if query is None and rest:
+        query, rest = rest[0], rest[1:]
+    key = (func.__qualname__, query, repr(rest),
+           repr(sorted(params.items())))
+    tables = {table.lower() for table in TABLE_PATTERN.findall(query or '')}
+    return query, key, tables
+
+def _run_on_new_connection(func, connect, args, kwargs):
+    conn = connect()
+    try:
+        return func(conn, *args, **kwargs)
+    finally:
+        conn.close()
+
+async def _arun_on_new_connection(func, aconnect, args, kwargs):
+    if aconnect is None:
+        import aiosqlite  # only needed by async callers
+        conn = await aiosqlite.connect('users.db')
+    else:
+        conn = await aconnect()
+    try:
+        return await func(conn, *args, **kwargs)
+    finally:
+        await conn.close()
+
 @with_db_connection
 @cache_query
 def fetch_users_with_cache(conn, query):
@@ -43,8 +357,48 @@ def fetch_users_with_cache(conn, query):
     cursor.execute(query)
     return cursor.fetchall()
 
-#### First call will cache the result
-users = fetch_users_with_cache(query="SELECT * FROM users")
+@with_db_connection
+@cache_query(ttl=60)
+def fetch_user_by_id(conn, query, user_id):
+    cursor = conn.cursor()
+    cursor.execute(query, (user_id,))
+    return cursor.fetchone()
+
+@with_db_connection
+@cache_query(ttl=5, stale_while_revalidate=300)
+def fetch_dashboard_counts(conn, query):
+    cursor = conn.cursor()
+    cursor.execute(query)
+    return cursor.fetchall()
+
+@with_db_connection
+@transactional
+def update_user_email(conn, user_id, new_email):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+if __name__ == "__main__":
+    #### First call will cache the result
+    users = fetch_users_with_cache(query="SELECT * FROM users")
+
+    #### Second call will use the cached result
+    users_again = fetch_users_with_cache(query="SELECT * FROM users")
+
+    #### Different params are cached separately
+    fetch_user_by_id(query="SELECT * FROM users WHERE id = ?", user_id=1)
+    fetch_user_by_id(query="SELECT * FROM users WHERE id = ?", user_id=2)
+
+    #### A write to users through @transactional invalidates both entries
+    update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
+    users_after_write = fetch_users_with_cache(query="SELECT * FROM users")
 
-#### Second call will use the cached result
-users_again = fetch_users_with_cache(query="SELECT * FROM users")
+    #### Concurrent misses on one query run it only once
+    query_cache.clear()
+    threads = [threading.Thread(target=fetch_users_with_cache,
+                                kwargs={'query': "SELECT * FROM users"})
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(query_cache.info())
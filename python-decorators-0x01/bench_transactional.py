@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Benchmark: write throughput of @transactional with one commit per write
+vs group_commit batching many writes into one commit.
+
+Runs against a scratch SQLite file (not users.db) in WAL mode with
+synchronous=FULL, so every commit pays for an fsync.
+
+Usage: ./bench_transactional.py [writes] [batch_size]
+"""
+import io
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import contextlib
+
+transactional_module = __import__('2-transactional')
+transactional = transactional_module.transactional
+group_commit = transactional_module.group_commit
+
+WRITES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+BATCH = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+
+@transactional
+def insert_user(conn, user_id):
+    conn.execute("INSERT INTO users (id, name, email) VALUES (?, ?, ?)",
+                 (user_id, f"user{user_id}", f"user{user_id}@example.com"))
+
+
+def fresh_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = FULL")
+    conn.execute("DROP TABLE IF EXISTS users")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, "
+                 "email TEXT)")
+    conn.commit()
+    return conn
+
+
+def commit_per_write(conn):
+    for user_id in range(WRITES):
+        insert_user(conn, user_id)
+
+
+def grouped(conn):
+    with group_commit(conn, every=BATCH, immediate=True):
+        for user_id in range(WRITES):
+            insert_user(conn, user_id)
+
+
+def timed(run, path):
+    conn = fresh_db(path)
+    start = time.perf_counter()
+    run(conn)
+    elapsed = time.perf_counter() - start
+    count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    conn.close()
+    assert count == WRITES, count
+    return elapsed
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        # The decorator logs every commit; keep that out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            single = timed(commit_per_write, path)
+            batched = timed(grouped, path)
+
+    print(f"writes: {WRITES}, batch size: {BATCH}")
+    print(f"commit per write : {WRITES / single:12.0f} writes/s "
+          f"({single * 1000:.1f} ms)")
+    print(f"group commit     : {WRITES / batched:12.0f} writes/s "
+          f"({batched * 1000:.1f} ms)")
+    print(f"speedup          : {single / batched:12.1f}x")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test cases for QueryCache and the cache_query decorator."""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+cache_module = __import__('4-cache_query')
+transactional_module = __import__('2-transactional')
+QueryCache = cache_module.QueryCache
+cache_query = cache_module.cache_query
+transactional = transactional_module.transactional
+
+
+class TestQueryCache(unittest.TestCase):
+    """Bounds and expiry of QueryCache itself."""
+
+    def test_lru_eviction(self):
+        """The least recently used entry goes once max_entries is hit."""
+        cache = QueryCache(max_entries=2)
+        cache.set('a', [1])
+        cache.set('b', [2])
+        cache.get('a')
+        cache.set('c', [3])
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, [1]))
+        self.assertEqual(cache.info()['evictions'], 1)
+
+    def test_ttl_and_stale_window(self):
+        """Expired entries are stale within stale_for, then missing."""
+        cache = QueryCache()
+        cache.set('a', [1], ttl=0.05)
+        self.assertEqual(cache.lookup('a'), ('fresh', [1]))
+        time.sleep(0.06)
+        self.assertEqual(cache.lookup('a', stale_for=10), ('stale', [1]))
+        self.assertEqual(cache.lookup('a'), ('miss', None))
+
+    def test_invalidate_by_table(self):
+        """Only entries tagged with the written table are dropped."""
+        cache = QueryCache()
+        cache.set('users', [1], tables={'users'})
+        cache.set('orders', [2], tables={'orders'})
+        cache.invalidate_tables({'users'})
+        self.assertEqual(cache.get('users'), (False, None))
+        self.assertEqual(cache.get('orders'), (True, [2]))
+
+
+class TestCacheQuery(unittest.TestCase):
+    """The decorator against a temp SQLite file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.tmp.name, 'users.db'),
+                                    check_same_thread=False)
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, "
+                          "email TEXT)")
+        self.conn.execute("INSERT INTO users VALUES (1, 'old@example.com')")
+        self.conn.commit()
+        self.cache = QueryCache()
+        self.listener = self.cache.invalidate_tables
+        transactional_module.commit_listeners.append(self.listener)
+        self.calls = 0
+
+    def tearDown(self):
+        transactional_module.commit_listeners.remove(self.listener)
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def fetch(self, delay=0):
+        """A cached fetch that counts how often it really runs."""
+        @cache_query(cache=self.cache)
+        def fetch_users(conn, query):
+            self.calls += 1
+            time.sleep(delay)
+            return conn.execute(query).fetchall()
+        return fetch_users
+
+    def test_hit_after_miss(self):
+        """The second identical call is served from the cache."""
+        fetch_users = self.fetch()
+        first = fetch_users(self.conn, query="SELECT * FROM users")
+        second = fetch_users(self.conn, query="SELECT * FROM users")
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidate_after_write(self):
+        """A committed @transactional write drops entries for its table."""
+        @transactional
+        def update_email(conn, email):
+            conn.execute("UPDATE users SET email = ? WHERE id = 1", (email,))
+
+        fetch_users = self.fetch()
+        fetch_users(self.conn, query="SELECT * FROM users")
+        update_email(self.conn, 'new@example.com')
+        rows = fetch_users(self.conn, query="SELECT * FROM users")
+        self.assertEqual(rows, [(1, 'new@example.com')])
+        self.assertEqual(self.calls, 2)
+
+    def test_concurrent_misses_coalesce(self):
+        """Concurrent misses on one key run the query only once."""
+        fetch_users = self.fetch(delay=0.1)
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(
+                fetch_users(self.conn, query="SELECT * FROM users")))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [[(1, 'old@example.com')]] * 8)
+        self.assertEqual(self.cache.info()['coalesced'], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test cases for retry_on_failure and RetryBudget."""
+
+import os
+import sys
+import time
+import sqlite3
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+retry_module = __import__('3-retry_on_failure')
+RetryBudget = retry_module.RetryBudget
+retry_on_failure = retry_module.retry_on_failure
+
+
+def failing(times, error):
+    """Returns a function that raises `error` its first `times` calls."""
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= times:
+            raise error
+        return 'ok'
+    return func, calls
+
+
+class TestRetryOnFailure(unittest.TestCase):
+    """Which errors are retried and when retrying stops."""
+
+    def test_transient_error_is_retried(self):
+        """A locked database is retried until it succeeds."""
+        func, calls = failing(2, sqlite3.OperationalError(
+            "database is locked"))
+        wrapped = retry_on_failure(retries=3, delay=0, budget=None)(func)
+        self.assertEqual(wrapped(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_programming_error_is_not_retried(self):
+        """A syntax error is raised on the first attempt."""
+        func, calls = failing(1, sqlite3.OperationalError(
+            'near "SELEC": syntax error'))
+        wrapped = retry_on_failure(retries=3, delay=0, budget=None)(func)
+        with self.assertRaises(sqlite3.OperationalError):
+            wrapped()
+        self.assertEqual(len(calls), 1)
+
+    def test_empty_budget_stops_retries(self):
+        """With no tokens left the call gives up after one attempt."""
+        budget = RetryBudget(ratio=0, min_tokens=0, min_per_second=0)
+        func, calls = failing(5, sqlite3.OperationalError(
+            "database is locked"))
+        wrapped = retry_on_failure(retries=5, delay=0, budget=budget)(func)
+        with self.assertRaises(sqlite3.OperationalError):
+            wrapped()
+        self.assertEqual(len(calls), 1)
+
+
+class TestRetryBudget(unittest.TestCase):
+    """Token accounting of RetryBudget."""
+
+    def test_calls_earn_retries(self):
+        """Each call deposits `ratio` tokens."""
+        budget = RetryBudget(ratio=0.5, min_tokens=0, min_per_second=0)
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+    def test_refills_over_time(self):
+        """An exhausted budget recovers at min_per_second."""
+        budget = RetryBudget(ratio=0, min_tokens=0, min_per_second=50)
+        self.assertFalse(budget.withdraw())
+        time.sleep(0.05)
+        self.assertTrue(budget.withdraw())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test cases for the transactional decorator and group_commit."""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+transactional_module = __import__('2-transactional')
+transactional = transactional_module.transactional
+group_commit = transactional_module.group_commit
+
+
+@transactional
+def insert_user(conn, user_id, fail=False):
+    conn.execute("INSERT INTO users (id, name) VALUES (?, ?)",
+                 (user_id, f"user{user_id}"))
+    if fail:
+        raise RuntimeError("insert failed")
+
+
+@transactional
+def insert_two_then_fail(conn):
+    # Nested calls before the outer scope writes anything itself
+    insert_user(conn, 1)
+    insert_user(conn, 2)
+    raise RuntimeError("outer failed")
+
+
+@transactional
+def insert_with_failing_child(conn):
+    insert_user(conn, 1)
+    insert_user(conn, 2, fail=True)
+    insert_user(conn, 3)
+
+
+class TransactionalTestCase(unittest.TestCase):
+    """Runs each test against a fresh SQLite file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'users.db')
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, "
+                          "name TEXT)")
+        self.conn.commit()
+        self.other = sqlite3.connect(self.path)
+        self.committed = []
+        transactional_module.commit_listeners.append(self.committed.append)
+
+    def tearDown(self):
+        transactional_module.commit_listeners.remove(self.committed.append)
+        self.other.close()
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def visible_ids(self):
+        """Ids another connection can see, i.e. committed rows."""
+        return [row[0] for row in
+                self.other.execute("SELECT id FROM users ORDER BY id")]
+
+
+class TestNestedTransactions(TransactionalTestCase):
+    """Nested @transactional calls map to savepoints."""
+
+    def test_outer_failure_rolls_back_nested_calls(self):
+        """A failing outer scope undoes its nested calls' writes."""
+        insert_two_then_fail(self.conn)
+        self.assertEqual(self.visible_ids(), [])
+        self.assertEqual(self.committed, [])
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_failing_child_only_rolls_back_itself(self):
+        """A failing nested call rolls back to its savepoint."""
+        insert_with_failing_child(self.conn)
+        self.assertEqual(self.visible_ids(), [1, 3])
+        self.assertEqual(self.committed, [{'users'}])
+
+    def test_immediate_commits(self):
+        """immediate=True opens with BEGIN IMMEDIATE and commits."""
+        transactional(immediate=True)(insert_user.__wrapped__)(self.conn, 7)
+        self.assertEqual(self.visible_ids(), [7])
+
+
+class TestGroupCommit(TransactionalTestCase):
+    """group_commit batches many calls into few commits."""
+
+    def test_commit_counts(self):
+        """Commits happen every `every` calls and once more on exit."""
+        with group_commit(self.conn, every=2) as batch:
+            for user_id in range(5):
+                insert_user(self.conn, user_id)
+                self.assertTrue(self.conn.in_transaction)
+        self.assertEqual(batch.commits, 3)
+        self.assertEqual(self.visible_ids(), [0, 1, 2, 3, 4])
+        self.assertEqual(self.committed, [{'users'}] * 3)
+
+    def test_writes_are_held_until_a_commit(self):
+        """Without immediate, writes still wait for the batch commit."""
+        with group_commit(self.conn, every=100):
+            for user_id in range(5):
+                insert_user(self.conn, user_id)
+            self.assertEqual(self.visible_ids(), [])
+        self.assertEqual(self.visible_ids(), [0, 1, 2, 3, 4])
+
+    def test_failed_call_is_dropped_from_the_batch(self):
+        """A failing call rolls back only its own savepoint."""
+        with group_commit(self.conn, every=100) as batch:
+            for user_id in range(4):
+                insert_user(self.conn, user_id, fail=user_id == 2)
+        self.assertEqual(batch.commits, 1)
+        self.assertEqual(self.visible_ids(), [0, 1, 3])
+
+    def test_exception_rolls_back_pending_writes(self):
+        """An exception escaping the block discards uncommitted calls."""
+        with self.assertRaises(RuntimeError):
+            with group_commit(self.conn, every=2):
+                for user_id in range(3):
+                    insert_user(self.conn, user_id)
+                raise RuntimeError("batch failed")
+        self.assertEqual(self.visible_ids(), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,39 @@
 #!/usr/bin/python3
 
-import mysql.connector
 from mysql.connector import Error
 
-def stream_users():
+import db_pool
+
+
+def stream_users(fetch_size=1000):
     """
     Generator that streams user rows one at a time from user_data table.
+
+    The cursor is unbuffered, so the server result set is read off the
+    socket fetch_size rows at a time instead of being loaded into client
+    memory. Memory stays bounded by fetch_size whatever the table size.
     """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.',
-            database='ALX_prodev'
-        )
-
-        cursor = connection.cursor()
+        connection = db_pool.connect()
+    except Error as e:
+        print(f"Database error: {e}")
+        return
+
+    try:
+        cursor = connection.cursor(buffered=False)
         cursor.execute("SELECT * FROM user_data")
 
-        for row in cursor:
-            yield row  # YIELD one row at a time
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows  # YIELD one row at a time
 
         cursor.close()
-        connection.close()
-
     except Error as e:
         print(f"Database error: {e}")
         return
+    finally:
+        # An unbuffered cursor cannot be closed while rows are unread (e.g.
+        # the consumer stopped early); the pool discards such connections.
+        connection.close()
@@ -1,48 +1,149 @@
 #!/usr/bin/python3
 
-import mysql.connector
 from mysql.connector import Error
 
+import db_pool
 
-def stream_users_in_batches(batch_size):
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for columnar batches
+    np = None
+
+# Columns of user_data, in table order.
+USER_DATA_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+def build_select(columns=None, min_age=None, key_range=None):
+    """
+    Builds the SELECT for user_data with the projection and the age
+    predicate pushed into SQL. Returns (query, params).
+
+    key_range=(lower, upper) restricts the scan to lower <= user_id < upper
+    (either bound may be None) and orders it by user_id.
+    """
+    columns = tuple(columns) if columns else USER_DATA_COLUMNS
+    unknown = set(columns) - set(USER_DATA_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown user_data columns: {sorted(unknown)}")
+
+    query = f"SELECT {', '.join(columns)} FROM user_data"
+    conditions = []
+    params = []
+    if min_age is not None:
+        conditions.append("age > %s")
+        params.append(min_age)
+    if key_range is not None:
+        lower, upper = key_range
+        if lower is not None:
+            conditions.append("user_id >= %s")
+            params.append(lower)
+        if upper is not None:
+            conditions.append("user_id < %s")
+            params.append(upper)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if key_range is not None:
+        query += " ORDER BY user_id"
+    return query, tuple(params)
+
+
+def to_columnar(rows, columns=USER_DATA_COLUMNS):
+    """
+    Converts a list of row tuples into a dict of NumPy arrays, one per
+    column. Strings are stored as fixed-width UTF-8 bytes ('S' dtype, as
+    wide as the longest value in the batch) and age as float64.
+    """
+    batch = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows]
+        if column == 'age':
+            batch[column] = np.array(values, dtype=np.float64)
+        else:
+            batch[column] = np.array([value.encode('utf-8')
+                                      for value in values])
+    return batch
+
+
+def select_rows(batch, mask):
+    """Returns the rows of a columnar batch where mask is True."""
+    return {column: values[mask] for column, values in batch.items()}
+
+
+def stream_users_in_batches(batch_size, columns=None, min_age=None,
+                            columnar=False, workers=1, ordered=False,
+                            raise_errors=False):
     """
     Generator that yields batches of rows from user_data.
-    Each batch is a list of rows (tuples).
+    Each batch is a list of rows (tuples), pulled straight from the
+    cursor with fetchmany(batch_size).
+
+    columns limits the projection (defaults to every column) and
+    min_age filters on the server with WHERE age > %s.
+
+    columnar=True yields each batch as a dict of NumPy arrays (see
+    to_columnar) so consumers can filter with vectorized expressions,
+    e.g. select_rows(batch, batch['age'] > 25).
+
+    workers > 1 scans user_id ranges in parallel processes (see
+    6-parallel_scan). ordered=True then keeps batches in user_id order,
+    but only the first range streams freely; the others pause after a
+    few queued batches until their turn. An ordered scan therefore runs
+    at close to serial speed. Use ordered=False for throughput.
+
+    By default a database error is printed and ends the stream early.
+    raise_errors=True raises it instead, so callers that must not mistake
+    a truncated scan for a complete one (e.g. exports) can tell.
     """
+    if columnar and np is None:
+        raise RuntimeError("Columnar batches need NumPy installed")
+    query, params = build_select(columns, min_age)
+    columns = tuple(columns) if columns else USER_DATA_COLUMNS
+    if workers > 1:
+        scanner = __import__('6-parallel_scan')
+        for batch in scanner.parallel_batches(batch_size, workers, ordered,
+                                              columns, min_age,
+                                              raise_errors=raise_errors):
+            yield to_columnar(batch, columns) if columnar else batch
+        return
+    connection = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.',
-            database='ALX_prodev'
-        )
+        connection = db_pool.connect()
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM user_data")
+        cursor.execute(query, params)
 
-        batch = []
-        for row in cursor:
-            batch.append(row)
-            if len(batch) == batch_size:
-                yield batch
-                batch = []  # Reset for next batch
-
-        # Yield the final batch if not empty
-        if batch:
-            yield batch
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield to_columnar(batch, columns) if columnar else batch
 
         cursor.close()
-        connection.close()
     except Error as e:
+        if raise_errors:
+            raise
         print(f"Error fetching batches: {e}")
         return
+    finally:
+        if connection is not None:
+            connection.close()
 
 
-def batch_processing(batch_size):
+def batch_processing(batch_size, min_age=25, columns=None, predicate=None,
+                     workers=1):
     """
     Processes batches to filter users over the age of 25.
     Yields individual users (rows) from each batch who meet the condition.
+
+    The age threshold and column list are pushed down into SQL, so only
+    matching rows cross the wire. predicate is an optional Python-side
+    fallback for conditions SQL cannot express; it gets each row tuple.
+    workers > 1 runs the scan in parallel (rows come back unordered).
     """
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_users_in_batches(batch_size, columns, min_age,
+                                         workers=workers):
+        if predicate is None:
+            yield from batch
+            continue
         for user in batch:
-            if float(user[3]) > 25:  # age is the 4th column
+            if predicate(user):
                 yield user
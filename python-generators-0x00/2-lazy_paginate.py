@@ -1,39 +1,215 @@
 #!/usr/bin/python3
 
-import mysql.connector
+import queue
+import threading
+
 from mysql.connector import Error
 
-def paginate_users(page_size, offset):
+import db_pool
+
+# Columns that may be used as the ordered key for keyset pagination.
+KEYSET_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+def connect_to_prodev():
+    """ Borrow an ALX_prodev connection from the shared pool """
+    return db_pool.connect()
+
+
+def _fetch_page(query, params, connection=None, raise_errors=False):
     """
-    Fetches a single page of users starting at the given offset.
+    Runs a page query and returns all its rows.
+    Uses the given connection if there is one, otherwise opens (and closes)
+    a connection just for this page. A database error is printed and
+    gives an empty page, or is raised if raise_errors is set.
     """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.',
-            database='ALX_prodev'
-        )
+        owned = connection is None
+        if owned:
+            connection = connect_to_prodev()
         cursor = connection.cursor()
-        query = "SELECT * FROM user_data LIMIT %s OFFSET %s"
-        cursor.execute(query, (page_size, offset))
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         cursor.close()
-        connection.close()
+        if owned:
+            connection.close()
         return rows
     except Error as e:
+        if raise_errors:
+            raise
         print(f"Error in pagination: {e}")
         return []
 
-def lazy_paginate(page_size):
+
+def paginate_users(page_size, offset, connection=None, raise_errors=False):
     """
-    Generator that lazily fetches and yields pages of users.
-    Only loads the next page when needed.
+    Fetches a single page of users starting at the given offset.
     """
+    query = "SELECT * FROM user_data LIMIT %s OFFSET %s"
+    return _fetch_page(query, (page_size, offset), connection, raise_errors)
+
+
+def keyset_query(page_size, last_key=None, key='user_id'):
+    """
+    Returns (query, params) for the keyset page after last_key.
+
+    user_id is unique, so pages continue from WHERE user_id > last_key.
+    The other columns can repeat, so user_id breaks ties: pages are
+    ordered by (key, user_id) and last_key is the (key, user_id) pair of
+    the previous page's last row. Otherwise rows sharing a key value
+    across a page boundary would be skipped.
+    """
+    if key not in KEYSET_COLUMNS:
+        raise ValueError(f"Unsupported keyset column: {key}")
+    order = key if key == 'user_id' else f"{key}, user_id"
+    if last_key is None:
+        return (f"SELECT * FROM user_data ORDER BY {order} LIMIT %s",
+                (page_size,))
+    if key == 'user_id':
+        return ("SELECT * FROM user_data WHERE user_id > %s "
+                "ORDER BY user_id LIMIT %s", (last_key, page_size))
+    value, user_id = last_key
+    return (f"SELECT * FROM user_data WHERE ({key}, user_id) > (%s, %s) "
+            f"ORDER BY {order} LIMIT %s", (value, user_id, page_size))
+
+
+def last_key_of(page, key='user_id'):
+    """The last_key to pass to keyset_query for the page after `page`."""
+    row = page[-1]
+    if key == 'user_id':
+        return row[KEYSET_COLUMNS.index('user_id')]
+    return (row[KEYSET_COLUMNS.index(key)],
+            row[KEYSET_COLUMNS.index('user_id')])
+
+
+def paginate_users_keyset(page_size, last_key=None, key='user_id',
+                          connection=None, raise_errors=False):
+    """
+    Fetches the page of users that comes right after last_key.
+    Uses WHERE key > last_key ORDER BY key, so every page costs the same
+    no matter how deep into the table we are (no OFFSET rows to skip).
+    For keys other than user_id, last_key is a (key, user_id) pair (see
+    keyset_query).
+    """
+    query, params = keyset_query(page_size, last_key, key)
+    return _fetch_page(query, params, connection, raise_errors)
+
+
+def _iter_pages(page_size, mode, key, connection, start_key=None,
+                raise_errors=False):
+    """Yields successive pages over the given connection until empty."""
     offset = 0
+    last_key = start_key
     while True:  # This is our single loop
-        page = paginate_users(page_size, offset)
+        if mode == 'keyset':
+            page = paginate_users_keyset(page_size, last_key, key, connection,
+                                         raise_errors)
+        else:
+            page = paginate_users(page_size, offset, connection, raise_errors)
         if not page:
             break
         yield page
         offset += page_size
+        if mode == 'keyset':
+            last_key = last_key_of(page, key)
+
+
+def _prefetch(pages, depth):
+    """
+    Runs the `pages` generator on a background thread, keeping at most
+    `depth` pages queued ahead of the consumer. The thread is stopped and
+    joined when this generator is exhausted, closed or garbage-collected.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+        except Exception as e:  # re-raised in the consumer thread
+            put(e)
+            return
+        put(done)
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+        pages.close()
+
+
+def lazy_paginate(page_size, mode='offset', key='user_id', connection=None,
+                  prefetch=0, start_key=None, raise_errors=False):
+    """
+    Generator that lazily fetches and yields pages of users.
+    Only loads the next page when needed.
+
+    mode='offset' pages with LIMIT/OFFSET (the original behaviour).
+    mode='keyset' pages with WHERE key > last_seen, which keeps each page
+    O(page_size). Keys other than user_id (the primary key) are not
+    unique, so they page on (key, user_id) and no rows are skipped at
+    page boundaries. start_key resumes a keyset walk just after that key:
+    a user_id, or a (key, user_id) pair for the other keys.
+
+    One connection is used for every page. Pass connection= to borrow one
+    (e.g. from a pool); it is left open for the caller. Otherwise the
+    generator opens its own and closes it when it is exhausted, closed or
+    garbage-collected.
+
+    prefetch=N fetches up to N pages ahead on a background thread while
+    the current page is being processed, so a full scan takes roughly
+    max(db time, processing time) rather than their sum. Memory is
+    bounded by about N + 2 pages. The connection is only used by that thread
+    while the generator is running.
+
+    By default a database error is printed and ends the walk as if the
+    table were exhausted. raise_errors=True raises it instead, so callers
+    that must tell a failure from completion (e.g. checkpointed jobs) can.
+    """
+    if mode not in ('offset', 'keyset'):
+        raise ValueError(f"Unknown pagination mode: {mode}")
+    if mode == 'keyset' and key not in KEYSET_COLUMNS:
+        raise ValueError(f"Unsupported keyset column: {key}")
+    if start_key is not None and mode != 'keyset':
+        raise ValueError("start_key needs mode='keyset'")
+
+    owned = connection is None
+    if owned:
+        try:
+            connection = connect_to_prodev()
+        except Error as e:
+            if raise_errors:
+                raise
+            print(f"Error in pagination: {e}")
+            return
+
+    try:
+        pages = _iter_pages(page_size, mode, key, connection, start_key,
+                            raise_errors)
+        if prefetch > 0:
+            pages = _prefetch(pages, prefetch)
+        yield from pages
+    finally:
+        if owned:
+            connection.close()
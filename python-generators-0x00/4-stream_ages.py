@@ -1,19 +1,30 @@
 #!/usr/bin/python3
 
-import mysql.connector
+import math
+
 from mysql.connector import Error
 
+import db_pool
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the other backends still work
+    np = None
+
+BACKENDS = ('auto', 'sql', 'numpy', 'python')
+
+
+def connect_to_prodev():
+    """ Borrow an ALX_prodev connection from the shared pool """
+    return db_pool.connect()
+
+
 def stream_user_ages():
     """
     Generator that yields user ages one at a time from user_data table.
     """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.',
-            database='ALX_prodev'
-        )
+        connection = connect_to_prodev()
         cursor = connection.cursor()
         cursor.execute("SELECT age FROM user_data")
 
@@ -25,18 +36,178 @@ def stream_user_ages():
     except Error as e:
         print(f"Error streaming ages: {e}")
 
-def calculate_average_age():
+
+def stream_age_blocks(block_size=10_000):
+    """
+    Generator that yields ages as float64 NumPy arrays of up to
+    block_size values, one per cursor.fetchmany() call.
+    """
+    try:
+        connection = connect_to_prodev()
+        cursor = connection.cursor()
+        cursor.execute("SELECT age FROM user_data")
+
+        while True:
+            rows = cursor.fetchmany(block_size)
+            if not rows:
+                break
+            yield np.fromiter((row[0] for row in rows), dtype=np.float64,
+                              count=len(rows))
+
+        cursor.close()
+        connection.close()
+    except Error as e:
+        print(f"Error streaming ages: {e}")
+
+
+class AgeStats:
     """
-    Calculates and prints the average age using the stream_user_ages generator.
+    Streaming count/sum/mean/min/max/variance using Welford's algorithm.
+    Blocks of values (or other AgeStats) are combined with Chan's
+    parallel formula, so partial results can be merged.
     """
-    total = 0
-    count = 0
-    for age in stream_user_ages():  # ✅ Only one loop used here
-        total += age
-        count += 1
 
-    if count > 0:
-        average = total / count
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value):
+        """Adds a single value."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """Folds another AgeStats into this one."""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def update_block(self, block):
+        """Adds a NumPy array of values."""
+        if len(block) == 0:
+            return self
+        other = AgeStats()
+        other.count = len(block)
+        other.total = float(block.sum())
+        other.mean = other.total / other.count
+        other.m2 = float(((block - other.mean) ** 2).sum())
+        other.min = float(block.min())
+        other.max = float(block.max())
+        return self.merge(other)
+
+    @property
+    def variance(self):
+        """Population variance (0.0 when there are fewer than two values)."""
+        return self.m2 / self.count if self.count > 1 else 0.0
+
+    def as_dict(self):
+        if self.count == 0:
+            return {'count': 0, 'sum': 0.0, 'avg': None, 'min': None,
+                    'max': None, 'variance': None}
+        return {'count': self.count, 'sum': self.total, 'avg': self.mean,
+                'min': self.min, 'max': self.max, 'variance': self.variance}
+
+
+def _aggregate_sql():
+    """Lets MySQL compute the aggregates; only one row comes back."""
+    connection = connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(age), SUM(age), AVG(age), MIN(age), "
+                   "MAX(age), VAR_POP(age) FROM user_data")
+    count, total, avg, low, high, variance = cursor.fetchone()
+    cursor.close()
+    connection.close()
+    if not count:
+        return AgeStats().as_dict()
+    return {'count': count, 'sum': float(total), 'avg': float(avg),
+            'min': float(low), 'max': float(high),
+            'variance': float(variance)}
+
+
+def _parallel_age_batches(block_size, workers):
+    """Age-only batches from the parallel range scan."""
+    processing = __import__('1-batch_processing')
+    return processing.stream_users_in_batches(block_size, columns=('age',),
+                                              workers=workers)
+
+
+def _aggregate_numpy(block_size=10_000, workers=1):
+    stats = AgeStats()
+    if workers > 1:
+        blocks = (np.array([row[0] for row in batch], dtype=np.float64)
+                  for batch in _parallel_age_batches(block_size, workers))
+    else:
+        blocks = stream_age_blocks(block_size)
+    for block in blocks:
+        stats.update_block(block)
+    return stats.as_dict()
+
+
+def _aggregate_python(workers=1):
+    stats = AgeStats()
+    if workers > 1:
+        ages = (float(row[0])
+                for batch in _parallel_age_batches(1000, workers)
+                for row in batch)
+    else:
+        ages = stream_user_ages()
+    for age in ages:
+        stats.update(age)
+    return stats.as_dict()
+
+
+def aggregate_ages(backend='auto', workers=1):
+    """
+    Returns count, sum, avg, min, max and population variance of ages.
+
+    backend='sql' pushes the work into MySQL, 'numpy' reduces fetchmany
+    blocks as float64 arrays and 'python' streams through
+    stream_user_ages(). 'auto' tries SQL first and falls back to NumPy
+    (when installed) and then pure Python if the query fails.
+    workers > 1 makes the streaming backends use the parallel range scan.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown aggregation backend: {backend}")
+    if backend == 'numpy' and np is None:
+        raise RuntimeError("The numpy backend needs NumPy installed")
+
+    if backend == 'auto':
+        try:
+            return _aggregate_sql()
+        except Error as e:
+            print(f"SQL aggregation failed, streaming instead: {e}")
+        backend = 'numpy' if np is not None else 'python'
+
+    if backend == 'sql':
+        return _aggregate_sql()
+    if backend == 'numpy':
+        return _aggregate_numpy(workers=workers)
+    return _aggregate_python(workers=workers)
+
+
+def calculate_average_age(backend='auto', workers=1):
+    """
+    Calculates and prints the average age of users.
+    """
+    average = aggregate_ages(backend, workers)['avg']
+    if average is not None:
         print(f"Average age of users: {average:.2f}")
     else:
         print("No users found to calculate average.")
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Async generator counterparts of the streaming modules, built on aiomysql.
+Use them with `async for`; one event loop can drive many streams at once.
+"""
+import asyncio
+
+import aiomysql
+
+import db_pool
+
+paginator = __import__('2-lazy_paginate')
+
+
+async def connect_to_prodev():
+    """ Connect to the ALX_prodev database (settings from db_pool) """
+    config = db_pool.settings()['connect']
+    return await aiomysql.connect(
+        host=config['host'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database']
+    )
+
+
+async def _stream_query(query, params=(), fetch_size=1000):
+    """
+    Async generator that yields lists of up to fetch_size rows for a query,
+    read through an unbuffered (server-side streaming) cursor.
+    """
+    try:
+        connection = await connect_to_prodev()
+    except aiomysql.Error as e:
+        print(f"Database error: {e}")
+        return
+    try:
+        cursor = await connection.cursor(aiomysql.SSCursor)
+        await cursor.execute(query, params)
+        while True:
+            rows = await cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+        await cursor.close()
+    except aiomysql.Error as e:
+        print(f"Database error: {e}")
+    finally:
+        connection.close()
+
+
+async def astream_users(fetch_size=1000):
+    """
+    Async generator that streams user rows one at a time from user_data.
+    """
+    async for rows in _stream_query("SELECT * FROM user_data",
+                                    fetch_size=fetch_size):
+        for row in rows:
+            yield row
+
+
+async def astream_users_in_batches(batch_size):
+    """
+    Async generator that yields batches (lists of rows) from user_data.
+    """
+    async for batch in _stream_query("SELECT * FROM user_data",
+                                     fetch_size=batch_size):
+        yield batch
+
+
+async def astream_user_ages(fetch_size=1000):
+    """
+    Async generator that yields user ages one at a time from user_data.
+    """
+    async for rows in _stream_query("SELECT age FROM user_data",
+                                    fetch_size=fetch_size):
+        for row in rows:
+            yield float(row[0])
+
+
+async def _fetch_page(connection, query, params):
+    async with connection.cursor() as cursor:
+        await cursor.execute(query, params)
+        return await cursor.fetchall()
+
+
+async def alazy_paginate(page_size, mode='offset', key='user_id'):
+    """
+    Async generator that yields pages of users over one connection.
+
+    The next page is requested as soon as the current one is handed to the
+    consumer, so the database round trip overlaps with the consumer's
+    work. Modes match lazy_paginate: 'offset' or 'keyset' on `key`.
+    """
+    if mode not in ('offset', 'keyset'):
+        raise ValueError(f"Unknown pagination mode: {mode}")
+    if key not in paginator.KEYSET_COLUMNS:
+        raise ValueError(f"Unsupported keyset column: {key}")
+
+    def page_query(offset, last_key):
+        if mode == 'offset':
+            return ("SELECT * FROM user_data LIMIT %s OFFSET %s",
+                    (page_size, offset))
+        # Same (key, user_id) tie-breaking as lazy_paginate
+        return paginator.keyset_query(page_size, last_key, key)
+
+    try:
+        connection = await connect_to_prodev()
+    except aiomysql.Error as e:
+        print(f"Error in pagination: {e}")
+        return
+
+    pending = None
+    try:
+        offset = 0
+        page = await _fetch_page(connection, *page_query(0, None))
+        while page:
+            offset += page_size
+            last_key = paginator.last_key_of(page, key)
+            pending = asyncio.ensure_future(
+                _fetch_page(connection, *page_query(offset, last_key)))
+            yield page
+            page = await pending
+            pending = None
+    except aiomysql.Error as e:
+        print(f"Error in pagination: {e}")
+    finally:
+        if pending is not None:
+            pending.cancel()
+        connection.close()
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+import asyncio
+
+streams = __import__('5-async_streams')
+
+
+async def count_pages(page_size):
+    pages = 0
+    async for _ in streams.alazy_paginate(page_size, mode='keyset'):
+        pages += 1
+    return pages
+
+
+async def average_age():
+    total = count = 0
+    async for age in streams.astream_user_ages():
+        total += age
+        count += 1
+    return total / count if count else 0
+
+
+async def main():
+    # Several independent streams share a single event loop
+    pages, average = await asyncio.gather(count_pages(100), average_age())
+    print(f"Pages of 100 users: {pages}")
+    print(f"Average age of users: {average:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
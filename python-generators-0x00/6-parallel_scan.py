@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""
+Parallel, range-partitioned scan of user_data.
+
+user_data is split into ranges of its user_id primary key and each range
+is scanned by its own process over its own connection. Batches are merged
+back either in user_id order or as soon as any worker produces them.
+"""
+import multiprocessing
+import queue
+
+from mysql.connector import Error
+
+import db_pool
+
+processing = __import__('1-batch_processing')
+
+# Batches each worker may queue ahead of the consumer.
+QUEUE_DEPTH = 4
+
+# Split point candidates fetched per range by key_ranges.
+SPLIT_OVERSAMPLE = 4
+
+
+def key_ranges(workers):
+    """
+    Splits user_data into `workers` (lower, upper) user_id ranges holding
+    about the same number of rows each.
+
+    The split points are read from the data, not guessed from the UUID
+    format: LOAD DATA fills user_id with MySQL's UUID() (version 1), whose
+    timestamp prefix puts a whole load into one narrow band. One pass of
+    ROW_NUMBER() over the primary key returns every step-th user_id,
+    with step taken from the table's row estimate so that about
+    SPLIT_OVERSAMPLE candidates come back per range. The bounds are then
+    picked evenly from those candidates, which absorbs a rough estimate.
+    Small tables may give fewer ranges than workers.
+    """
+    if workers <= 1:
+        return [(None, None)]
+    try:
+        connection = db_pool.connect()
+        cursor = connection.cursor()
+        cursor.execute("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                       "WHERE TABLE_SCHEMA = DATABASE() "
+                       "AND TABLE_NAME = 'user_data'")
+        row = cursor.fetchone()
+        estimate = row[0] if row and row[0] else 0
+        if not estimate:  # no statistics yet
+            cursor.execute("SELECT COUNT(*) FROM user_data")
+            estimate = cursor.fetchone()[0]
+        step = max(1, estimate // (workers * SPLIT_OVERSAMPLE))
+        cursor.execute("SELECT user_id FROM (SELECT user_id, ROW_NUMBER() "
+                       "OVER (ORDER BY user_id) AS rn FROM user_data) "
+                       "AS numbered WHERE MOD(rn, %s) = 0", (step,))
+        candidates = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        connection.close()
+    except Error as e:
+        print(f"Error computing scan ranges, scanning serially: {e}")
+        return [(None, None)]
+
+    # candidates[j] sits at about (j + 1) / (n + 1) of the table
+    n = len(candidates)
+    bounds = [None]
+    for i in range(1, workers):
+        j = min(n - 1, i * (n + 1) // workers - 1)
+        if j >= 0 and candidates[j] not in bounds:
+            bounds.append(candidates[j])
+    bounds.append(None)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def scan_range(key_range, batch_size, columns, min_age, out, tag):
+    """
+    Worker process: streams one user_id range and puts (tag, batch) on
+    `out`, then (tag, None) when done or (tag, error message) on failure.
+    """
+    query, params = processing.build_select(columns, min_age, key_range)
+    try:
+        connection = db_pool.connect()
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            out.put((tag, batch))
+        cursor.close()
+        connection.close()
+    except Error as e:
+        out.put((tag, f"Error scanning {key_range}: {e}"))
+        return
+    out.put((tag, None))
+
+
+def _get(q, process):
+    """Blocking get that gives up if the producing process has died."""
+    while True:
+        try:
+            return q.get(timeout=1)
+        except queue.Empty:
+            if not any(p.is_alive() for p in process):
+                try:
+                    return q.get_nowait()
+                except queue.Empty:
+                    raise RuntimeError("scan worker exited unexpectedly")
+
+
+def parallel_batches(batch_size, workers=4, ordered=False, columns=None,
+                     min_age=None, raise_errors=False):
+    """
+    Generator that yields batches (lists of row tuples) from user_data,
+    scanned by `workers` processes in parallel.
+
+    ordered=True yields whole partitions one after another in user_id
+    order. Each later partition's worker stops once QUEUE_DEPTH batches
+    are queued and waits until its turn, so an ordered scan is close to
+    a serial one: it only overlaps fetching with the consumer's work.
+    With ordered=False batches are yielded as soon as any worker has one
+    and the partitions really are scanned in parallel.
+
+    A worker's database error is printed and ends its partition, or is
+    raised (as mysql.connector.Error) if raise_errors is set.
+    """
+    columns = tuple(columns) if columns else processing.USER_DATA_COLUMNS
+    ranges = key_ranges(workers)
+    context = multiprocessing.get_context()
+    if ordered:
+        queues = [context.Queue(QUEUE_DEPTH) for _ in ranges]
+    else:
+        queues = [context.Queue(QUEUE_DEPTH * workers)] * len(ranges)
+
+    processes = [
+        context.Process(target=scan_range, daemon=True,
+                        args=(key_range, batch_size, columns, min_age,
+                              queues[tag], tag))
+        for tag, key_range in enumerate(ranges)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        if ordered:
+            for tag, q in enumerate(queues):
+                while True:
+                    _, batch = _get(q, [processes[tag]])
+                    if batch is None:
+                        break
+                    if isinstance(batch, str):
+                        if raise_errors:
+                            raise Error(batch)
+                        print(batch)
+                        break
+                    yield batch
+        else:
+            remaining = len(ranges)
+            while remaining:
+                _, batch = _get(queues[0], processes)
+                if batch is None or isinstance(batch, str):
+                    if batch and raise_errors:
+                        raise Error(batch)
+                    if batch:
+                        print(batch)
+                    remaining -= 1
+                    continue
+                yield batch
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+def parallel_stream_users(workers=4, batch_size=1000, ordered=False):
+    """
+    Generator that streams user rows one at a time, scanned in parallel.
+    """
+    for batch in parallel_batches(batch_size, workers, ordered):
+        yield from batch
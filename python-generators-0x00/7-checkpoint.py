@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Resumable, checkpointed scans of user_data.
+
+The scan walks user_data in keyset order (lazy_paginate, mode='keyset')
+and records the last user_id handed out in a local SQLite file, so a job
+that dies halfway resumes after the last checkpoint instead of row zero.
+stream_users reads in no particular order, so it cannot be resumed; use
+these helpers for long exports instead.
+"""
+import sqlite3
+from datetime import datetime, timezone
+
+paginator = __import__('2-lazy_paginate')
+
+USER_ID_INDEX = paginator.KEYSET_COLUMNS.index('user_id')
+
+
+class Checkpoint:
+    """
+    Progress of one job, stored in the `checkpoints` table of a SQLite
+    file. `connection` is exposed so callbacks can write their own output
+    in the same transaction as the checkpoint.
+    """
+
+    def __init__(self, job, path='checkpoints.db'):
+        self.job = job
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "job TEXT PRIMARY KEY, last_key TEXT, batch_id INTEGER, "
+            "rows INTEGER, updated_at TEXT)")
+        self.connection.commit()
+        row = self.connection.execute(
+            "SELECT last_key, batch_id, rows FROM checkpoints WHERE job = ?",
+            (job,)).fetchone()
+        self.last_key, self.batch_id, self.rows = row or (None, 0, 0)
+
+    def advance(self, last_key, rows):
+        """Records one more delivered batch (not committed yet)."""
+        self.last_key = last_key
+        self.batch_id += 1
+        self.rows += rows
+        self.connection.execute(
+            "INSERT OR REPLACE INTO checkpoints "
+            "(job, last_key, batch_id, rows, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self.job, last_key, self.batch_id, self.rows,
+             datetime.now(timezone.utc).isoformat()))
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+        row = self.connection.execute(
+            "SELECT last_key, batch_id, rows FROM checkpoints WHERE job = ?",
+            (self.job,)).fetchone()
+        self.last_key, self.batch_id, self.rows = row or (None, 0, 0)
+
+    def reset(self):
+        """Forgets the job's progress so the next run starts from scratch."""
+        self.connection.execute("DELETE FROM checkpoints WHERE job = ?",
+                                (self.job,))
+        self.connection.commit()
+        self.last_key, self.batch_id, self.rows = None, 0, 0
+
+    def close(self):
+        self.connection.close()
+
+
+def resumable_pages(job, page_size, path='checkpoints.db'):
+    """
+    Generator that yields pages of users, resuming after the last page
+    checkpointed for `job`. A page is checkpointed when the consumer asks
+    for the next one, so a crash re-delivers at most the page that was
+    being processed (at-least-once).
+    """
+    checkpoint = Checkpoint(job, path)
+    try:
+        # raise_errors: a failed fetch must not look like the end of the
+        # table, or the job would be checkpointed as finished
+        for page in paginator.lazy_paginate(page_size, mode='keyset',
+                                            start_key=checkpoint.last_key,
+                                            raise_errors=True):
+            yield page
+            checkpoint.advance(page[-1][USER_ID_INDEX], len(page))
+            checkpoint.commit()
+    finally:
+        checkpoint.close()
+
+
+def run_checkpointed(job, callback, page_size=1000, every=1,
+                     path='checkpoints.db'):
+    """
+    Delivers every page of users to callback(page, checkpoint), resuming
+    where the last run of `job` stopped. Returns the checkpoint totals.
+
+    The checkpoint is committed every `every` pages, in one SQLite
+    transaction with whatever the callback wrote through
+    checkpoint.connection. If the job dies, both are rolled back together,
+    so each page's effects are applied exactly once. Callbacks with
+    external side effects should make them idempotent on
+    checkpoint.batch_id, the number of the page being delivered, which is
+    the same on every run.
+    """
+    checkpoint = Checkpoint(job, path)
+    pending = 0
+    try:
+        # raise_errors: a failed fetch must not look like the end of the
+        # table, or the job would be checkpointed as finished
+        for page in paginator.lazy_paginate(page_size, mode='keyset',
+                                            start_key=checkpoint.last_key,
+                                            raise_errors=True):
+            checkpoint.advance(page[-1][USER_ID_INDEX], len(page))
+            callback(page, checkpoint)
+            pending += 1
+            if pending == every:
+                checkpoint.commit()
+                pending = 0
+        checkpoint.commit()
+        return {'batches': checkpoint.batch_id, 'rows': checkpoint.rows,
+                'last_key': checkpoint.last_key}
+    except BaseException:
+        checkpoint.rollback()
+        raise
+    finally:
+        checkpoint.close()
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""
+Streaming export of user_data to CSV, NDJSON or Parquet.
+
+Rows go from the cursor to the file one fetchmany batch at a time, so
+memory use depends on batch_size, not on the size of the table.
+
+Usage: ./8-export_users.py <path> [csv|ndjson|parquet] [--gzip]
+"""
+import csv
+import gzip
+import json
+import sys
+import time
+
+processing = __import__('1-batch_processing')
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for format='parquet'
+    pa = pq = None
+
+FORMATS = ('csv', 'ndjson', 'parquet')
+WRITE_BUFFER = 1 << 20
+
+
+def _json_value(value):
+    """Decimal ages become int (or float) so json can encode them."""
+    if hasattr(value, 'as_integer_ratio') and not isinstance(value, float):
+        return int(value) if value == int(value) else float(value)
+    return value
+
+
+def _parquet_schema(columns):
+    """
+    One fixed schema for every row group. Inferring it per batch would
+    give Decimal ages a precision that depends on the batch (2 digits,
+    or 3 once someone is 100+), which ParquetWriter rejects.
+    """
+    return pa.schema([(column, pa.int64() if column == 'age'
+                       else pa.string()) for column in columns])
+
+
+def _open_text(path, use_gzip):
+    if use_gzip:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='',
+                buffering=WRITE_BUFFER)
+
+
+def progress_meter(every=1.0, out=sys.stderr):
+    """
+    Returns a progress callback that prints rows written and rows/s at
+    most once every `every` seconds.
+    """
+    start = time.perf_counter()
+    last = [start]
+
+    def report(rows, final=False):
+        now = time.perf_counter()
+        if final or now - last[0] >= every:
+            last[0] = now
+            rate = rows / (now - start) if now > start else 0
+            print(f"\r{rows} rows, {rate:,.0f} rows/s", end='\n' if final
+                  else '', file=out, flush=True)
+    return report
+
+
+def export_users(path, fmt='csv', use_gzip=False, batch_size=10_000,
+                 columns=None, min_age=None, progress=None):
+    """
+    Writes user_data to `path` and returns the number of rows written.
+
+    fmt is 'csv' (with a header row), 'ndjson' (one JSON object per line)
+    or 'parquet' (one row group per batch, needs pyarrow). use_gzip
+    compresses csv/ndjson output. columns and min_age are pushed down into
+    the query as in stream_users_in_batches. progress(rows) is called
+    after every batch. A database error part way through is raised
+    (mysql.connector.Error), since the file written so far is incomplete.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and pq is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+    columns = tuple(columns) if columns else processing.USER_DATA_COLUMNS
+    # raise_errors: a failed fetch must fail the export, not leave a
+    # truncated file that looks complete
+    batches = processing.stream_users_in_batches(batch_size, columns,
+                                                 min_age, raise_errors=True)
+    rows = 0
+
+    if fmt == 'parquet':
+        schema = _parquet_schema(columns)
+        age = columns.index('age') if 'age' in columns else None
+        writer = pq.ParquetWriter(
+            path, schema, compression='gzip' if use_gzip else 'snappy')
+        try:
+            for batch in batches:
+                if age is not None:  # DECIMAL(10,0) -> int for int64
+                    batch = [row[:age] + (int(row[age]),) + row[age + 1:]
+                             for row in batch]
+                writer.write_table(pa.Table.from_pylist(
+                    [dict(zip(columns, row)) for row in batch],
+                    schema=schema))
+                rows += len(batch)
+                if progress:
+                    progress(rows)
+        finally:
+            writer.close()
+        return rows
+
+    with _open_text(path, use_gzip) as file:
+        if fmt == 'csv':
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(columns)
+            for batch in batches:
+                writer.writerows(batch)
+                rows += len(batch)
+                if progress:
+                    progress(rows)
+        else:
+            for batch in batches:
+                file.writelines(
+                    json.dumps(dict(zip(columns, map(_json_value, row))))
+                    + '\n' for row in batch)
+                rows += len(batch)
+                if progress:
+                    progress(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != '--gzip']
+    if not args:
+        sys.exit(__doc__)
+    fmt = args[1] if len(args) > 1 else 'csv'
+    meter = progress_meter()
+    total = export_users(args[0], fmt, '--gzip' in sys.argv, progress=meter)
+    meter(total, final=True)
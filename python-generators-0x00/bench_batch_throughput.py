@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""
+Benchmark: stream_users_in_batches throughput in rows per second.
+
+Runs a full scan of user_data for each batch size and reports rows/s.
+
+Usage: ./bench_batch_throughput.py [batch_size ...]
+"""
+import sys
+import time
+
+processing = __import__('1-batch_processing')
+
+BATCH_SIZES = [int(arg) for arg in sys.argv[1:]] or [50, 1000, 10_000]
+
+
+def scan(batch_size):
+    """Returns (rows, seconds) for one full scan."""
+    rows = 0
+    start = time.perf_counter()
+    for batch in processing.stream_users_in_batches(batch_size):
+        rows += len(batch)
+    return rows, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'batch size':>10} {'rows':>12} {'seconds':>10} {'rows/s':>12}")
+    for batch_size in BATCH_SIZES:
+        rows, seconds = scan(batch_size)
+        rate = rows / seconds if seconds else 0
+        print(f"{batch_size:>10} {rows:>12} {seconds:>10.3f} {rate:>12.0f}")
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Benchmark: a fresh connection per page vs one connection per generator.
+
+Walks the first PAGES pages of user_data both ways and reports the time
+saved by skipping the per-page TCP handshake and authentication.
+
+Usage: ./bench_connection_reuse.py [pages] [page_size]
+"""
+import sys
+import time
+
+import mysql.connector
+
+import db_pool
+
+paginator = __import__('2-lazy_paginate')
+
+PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+PAGE_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+
+def raw_connect():
+    """A new, unpooled connection (full TCP handshake and auth)."""
+    return mysql.connector.connect(**db_pool.settings()['connect'])
+
+
+def per_page_connections():
+    """The old behaviour: a new connection for each page."""
+    for page_no in range(PAGES):
+        connection = raw_connect()
+        page = paginator.paginate_users(PAGE_SIZE, page_no * PAGE_SIZE,
+                                        connection)
+        connection.close()
+        if not page:
+            break
+
+
+def reused_connection():
+    """lazy_paginate keeps a single connection for the whole walk."""
+    for page_no, _ in enumerate(paginator.lazy_paginate(PAGE_SIZE), 1):
+        if page_no == PAGES:
+            break
+
+
+def connect_only():
+    """Cost of the handshake alone, averaged over a few connects."""
+    start = time.perf_counter()
+    for _ in range(10):
+        raw_connect().close()
+    return (time.perf_counter() - start) / 10
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    per_page_connections()
+    fresh = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reused_connection()
+    reused = time.perf_counter() - start
+
+    handshake = connect_only()
+    print(f"pages: {PAGES}, page size: {PAGE_SIZE}")
+    print(f"connection per page : {fresh * 1000:10.2f} ms")
+    print(f"reused connection   : {reused * 1000:10.2f} ms")
+    print(f"saved               : {(fresh - reused) * 1000:10.2f} ms "
+          f"(~{handshake * 1000:.2f} ms per connect)")
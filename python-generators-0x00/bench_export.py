@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Benchmark: streaming export_users vs a naive fetchall + write loop.
+
+Each method runs in its own subprocess so peak RSS is measured
+separately. Output files are written to a temporary directory.
+
+Usage: ./bench_export.py [csv|ndjson]
+"""
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+exporter = __import__('8-export_users')
+
+
+def naive_export(path, fmt):
+    """fetchall() the whole table, then write it out row by row."""
+    connection = __import__('seed').connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("SELECT * FROM user_data")
+    rows = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    columns = exporter.processing.USER_DATA_COLUMNS
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        if fmt == 'csv':
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+        else:
+            for row in rows:
+                record = dict(zip(columns, map(exporter._json_value, row)))
+                file.write(json.dumps(record) + '\n')
+    return len(rows)
+
+
+def run(method, path, fmt):
+    start = time.perf_counter()
+    if method == 'naive':
+        rows = naive_export(path, fmt)
+    else:
+        rows = exporter.export_users(path, fmt)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{rows} {seconds:.3f} {peak:.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.exit(0)
+
+    fmt = sys.argv[1] if len(sys.argv) > 1 else 'csv'
+    print(f"{'method':<10} {'rows':>10} {'seconds':>10} {'rows/s':>12} "
+          f"{'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for method in ('naive', 'streaming'):
+            path = os.path.join(directory, f"{method}.{fmt}")
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', method, path, fmt],
+                capture_output=True, text=True, check=True).stdout.split()
+            rows, seconds, peak = int(out[-3]), float(out[-2]), float(out[-1])
+            rate = rows / seconds if seconds else 0
+            print(f"{method:<10} {rows:>10} {seconds:>10.3f} {rate:>12.0f} "
+                  f"{peak:>12.1f}")
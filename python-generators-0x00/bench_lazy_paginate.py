@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Benchmark: OFFSET vs keyset pagination in lazy_paginate.
+
+Tops user_data up to target_rows rows (1M by default) with synthetic
+"Bench User" rows and then times single pages fetched at increasing
+depths in the table. OFFSET pages get slower the deeper they are; keyset
+pages stay flat. The synthetic rows are deleted again when the run ends.
+The script writes to user_data, so it refuses to run without --fill.
+
+Usage: ./bench_lazy_paginate.py --fill [target_rows] [page_size]
+"""
+import sys
+import time
+import uuid
+
+seed = __import__('seed')
+paginator = __import__('2-lazy_paginate')
+
+DEPTHS = (0, 0.1, 0.25, 0.5, 0.75, 0.99)
+
+
+def fill_table(connection, target_rows, chunk_size=10_000):
+    """Tops user_data up to target_rows with synthetic users."""
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    existing = cursor.fetchone()[0]
+    query = ("INSERT INTO user_data (user_id, name, email, age) "
+             "VALUES (%s, %s, %s, %s)")
+    while existing < target_rows:
+        n = min(chunk_size, target_rows - existing)
+        rows = [(str(uuid.uuid4()), f"Bench User {existing + i}",
+                 f"bench{existing + i}@example.com", 18 + (existing + i) % 80)
+                for i in range(n)]
+        cursor.executemany(query, rows)
+        connection.commit()
+        existing += n
+    cursor.close()
+    return existing
+
+
+def drop_bench_rows(connection, chunk_size=10_000):
+    """Deletes the synthetic rows added by fill_table."""
+    cursor = connection.cursor()
+    while True:
+        cursor.execute("DELETE FROM user_data WHERE name LIKE %s "
+                       "AND email LIKE %s LIMIT %s",
+                       ('Bench User %', 'bench%@example.com', chunk_size))
+        connection.commit()
+        if cursor.rowcount < chunk_size:
+            break
+    cursor.close()
+
+
+def key_at(connection, offset):
+    """Returns the user_id just before the given offset (untimed setup)."""
+    if offset == 0:
+        return None
+    cursor = connection.cursor()
+    cursor.execute("SELECT user_id FROM user_data ORDER BY user_id "
+                   "LIMIT 1 OFFSET %s", (offset - 1,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if '--fill' not in args:
+        sys.exit(__doc__)
+    args.remove('--fill')
+    target_rows = int(args[0]) if args else 1_000_000
+    page_size = int(args[1]) if len(args) > 1 else 100
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        sys.exit(1)
+    try:
+        total = fill_table(connection, target_rows)
+        print(f"user_data rows: {total}, page size: {page_size}")
+        print(f"{'offset':>10} {'OFFSET ms':>12} {'keyset ms':>12}")
+        for depth in DEPTHS:
+            offset = int(total * depth)
+            last_key = key_at(connection, offset)
+            offset_time = timed(paginator.paginate_users, page_size, offset)
+            keyset_time = timed(paginator.paginate_users_keyset,
+                                page_size, last_key)
+            print(f"{offset:>10} {offset_time * 1000:>12.2f} "
+                  f"{keyset_time * 1000:>12.2f}")
+    finally:
+        drop_bench_rows(connection)
+        connection.close()
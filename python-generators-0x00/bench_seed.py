@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Benchmark: seed.insert_data (row-by-row) vs seed.bulk_insert_data.
+
+Writes a synthetic CSV of ROWS users and loads it with each method.
+user_data is TRUNCATED before every run, so only point this at a scratch
+database; the script refuses to run without --truncate.
+
+Usage: ./bench_seed.py --truncate [rows] [chunk_size]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+seed = __import__('seed')
+
+
+def write_csv(path, rows):
+    with open(path, mode='w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(['name', 'email', 'age'])
+        for i in range(rows):
+            writer.writerow([f"Bench User {i}", f"bench{i}@example.com",
+                             18 + i % 80])
+
+
+def truncate(connection):
+    cursor = connection.cursor()
+    cursor.execute("TRUNCATE TABLE user_data")
+    cursor.close()
+
+
+def timed(label, connection, func, *args, **kwargs):
+    truncate(connection)
+    start = time.perf_counter()
+    func(connection, *args, **kwargs)
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {seconds:10.2f} s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if '--truncate' not in args:
+        sys.exit(__doc__)
+    args.remove('--truncate')
+    rows = int(args[0]) if args else 100_000
+    chunk_size = int(args[1]) if len(args) > 1 else 1000
+
+    connection = seed.connect_to_prodev(allow_local_infile=True)
+    if not connection:
+        sys.exit(1)
+    seed.create_table(connection)
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        write_csv(path, rows)
+        print(f"rows: {rows}, chunk size: {chunk_size}")
+        timed("insert_data (per row)", connection, seed.insert_data, path)
+        timed("bulk_insert_data executemany", connection,
+              seed.bulk_insert_data, path, chunk_size, use_load_data=False)
+        if seed.local_infile_enabled(connection):
+            timed("bulk_insert_data LOAD DATA", connection,
+                  seed.bulk_insert_data, path, chunk_size)
+    finally:
+        os.remove(path)
+        connection.close()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Memory check for stream_users: peak RSS must not grow with the row count.
+
+Streams an increasing number of rows, each in a fresh subprocess so the
+peak RSS figures are independent, and fails if the peak for the largest
+run exceeds the smallest by more than TOLERANCE_MB. It also fails if a
+run streamed fewer rows than requested, since flat memory over the same
+rows proves nothing. With --fill, user_data is first topped up to
+max_rows with synthetic rows (as bench_lazy_paginate.py --fill does),
+which are deleted again at the end.
+
+Usage: ./bench_stream_memory.py [--fill] [max_rows] [fetch_size]
+"""
+import resource
+import subprocess
+import sys
+from itertools import islice
+
+TOLERANCE_MB = 16
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def stream(rows, fetch_size):
+    """Consumes `rows` rows from stream_users and prints the peak RSS."""
+    stream_users = __import__('0-stream_users').stream_users
+    count = sum(1 for _ in islice(stream_users(fetch_size), rows))
+    print(f"{count} {peak_rss_mb():.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        stream(int(sys.argv[2]), int(sys.argv[3]))
+        sys.exit(0)
+
+    args = sys.argv[1:]
+    fill = '--fill' in args
+    if fill:
+        args.remove('--fill')
+    max_rows = int(args[0]) if args else 10_000_000
+    fetch_size = int(args[1]) if len(args) > 1 else 1000
+    sizes = []
+    rows = 10_000
+    while rows < max_rows:
+        sizes.append(rows)
+        rows *= 10
+    sizes.append(max_rows)
+
+    if fill:
+        filler = __import__('bench_lazy_paginate')
+        connection = filler.seed.connect_to_prodev()
+        if not connection:
+            sys.exit(1)
+        filler.fill_table(connection, max_rows)
+
+    peaks = []
+    short = False
+    print(f"{'requested':>12} {'streamed':>12} {'peak RSS MB':>12}")
+    try:
+        for rows in sizes:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', str(rows),
+                 str(fetch_size)],
+                capture_output=True, text=True, check=True).stdout.split()
+            streamed, peak = int(out[-2]), float(out[-1])
+            peaks.append(peak)
+            short = short or streamed < rows
+            print(f"{rows:>12} {streamed:>12} {peak:>12.1f}")
+    finally:
+        if fill:
+            filler.drop_bench_rows(connection)
+            connection.close()
+
+    if short:
+        print("FAIL: user_data has fewer rows than requested; "
+              "rerun with --fill or a smaller max_rows")
+        sys.exit(1)
+
+    growth = peaks[-1] - peaks[0]
+    if growth > TOLERANCE_MB:
+        print(f"FAIL: peak RSS grew by {growth:.1f} MB")
+        sys.exit(1)
+    print(f"OK: peak RSS grew by {growth:.1f} MB")
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+"""
+Shared MySQL connection pool for the generator and seed scripts.
+
+Settings come from the environment (defaults in brackets):
+    MYSQL_HOST [localhost], MYSQL_USER [alxprodev_user],
+    MYSQL_PASSWORD, MYSQL_DATABASE [ALX_prodev],
+    MYSQL_POOL_MIN [1], MYSQL_POOL_MAX [8],
+    MYSQL_POOL_IDLE_TIMEOUT [300] seconds before a spare idle connection
+    is closed, MYSQL_POOL_ACQUIRE_TIMEOUT [30] seconds to wait for a free
+    connection, MYSQL_POOL_HEALTH_CHECK [30] seconds of idleness after
+    which a connection is pinged before being handed out.
+
+connect() returns a pooled connection; calling close() on it gives it
+back to the pool instead of closing the socket, so existing code that
+does connection.close() works unchanged.
+"""
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+
+def settings():
+    """Connection arguments and pool limits read from the environment."""
+    return {
+        'connect': {
+            'host': os.getenv('MYSQL_HOST', 'localhost'),
+            'user': os.getenv('MYSQL_USER', 'alxprodev_user'),
+            'password': os.getenv('MYSQL_PASSWORD', '@1Suburban.'),
+            'database': os.getenv('MYSQL_DATABASE', 'ALX_prodev'),
+        },
+        'min_size': int(os.getenv('MYSQL_POOL_MIN', '1')),
+        'max_size': int(os.getenv('MYSQL_POOL_MAX', '8')),
+        'idle_timeout': float(os.getenv('MYSQL_POOL_IDLE_TIMEOUT', '300')),
+        'acquire_timeout': float(os.getenv('MYSQL_POOL_ACQUIRE_TIMEOUT',
+                                           '30')),
+        'health_check': float(os.getenv('MYSQL_POOL_HEALTH_CHECK', '30')),
+    }
+
+
+class PooledConnection:
+    """
+    Wraps a pooled mysql.connector connection. Everything is delegated to
+    the real connection except close(), which releases it to the pool.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._connection is None:
+            raise PoolError("Connection has already been returned")
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self._connection is not None:
+            self._pool.release(self._connection)
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections with min/max size, health checks
+    on borrow, eviction of idle spares and acquire metrics.
+    """
+
+    def __init__(self, min_size=1, max_size=8, idle_timeout=300.0,
+                 acquire_timeout=30.0, health_check=30.0, **connect_kwargs):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Pool sizes need 0 <= min <= max and max >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        self.connect_kwargs = connect_kwargs
+        self._idle = []  # (connection, returned_at), most recent last
+        self._size = 0
+        self._lock = threading.Condition()
+        self._stats = {'created': 0, 'closed': 0, 'acquired': 0, 'waits': 0,
+                       'timeouts': 0, 'failed_checks': 0,
+                       'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+        for _ in range(min_size):
+            self._idle.append((self._create(), time.monotonic()))
+
+    def _create(self):
+        connection = mysql.connector.connect(**self.connect_kwargs)
+        with self._lock:
+            self._size += 1
+            self._stats['created'] += 1
+        return connection
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._stats['closed'] += 1
+            self._lock.notify()
+
+    def _healthy(self, connection, idle_since):
+        if time.monotonic() - idle_since < self.health_check:
+            return True
+        try:
+            return connection.is_connected()
+        except Error:
+            return False
+
+    def _evict_idle(self):
+        """Closes spare connections idle for longer than idle_timeout."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while (self._idle and self._size - len(expired) > self.min_size
+                   and now - self._idle[0][1] > self.idle_timeout):
+                expired.append(self._idle.pop(0)[0])
+        for connection in expired:
+            self._discard(connection)
+
+    def acquire(self, timeout=None):
+        """
+        Borrows a connection, waiting up to `timeout` seconds (default
+        acquire_timeout) for one to be free. Raises PoolError on timeout.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        self._evict_idle()
+        while True:
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolError(
+                            f"No connection available within {timeout}s")
+                    self._stats['waits'] += 1
+                    self._lock.wait(remaining)
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    self._size += 1  # reserve the slot before connecting
+            if entry is None:
+                try:
+                    connection = mysql.connector.connect(
+                        **self.connect_kwargs)
+                except Error:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._stats['created'] += 1
+                break
+            connection, idle_since = entry
+            if self._healthy(connection, idle_since):
+                break
+            with self._lock:
+                self._stats['failed_checks'] += 1
+            self._discard(connection)
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats['acquired'] += 1
+            self._stats['wait_seconds'] += waited
+            self._stats['max_wait_seconds'] = max(
+                self._stats['max_wait_seconds'], waited)
+        return connection
+
+    def release(self, connection):
+        """
+        Returns a connection to the pool. Connections with unread results
+        (e.g. an abandoned unbuffered cursor) are closed instead, and any
+        open transaction is rolled back.
+        """
+        try:
+            if getattr(connection, 'unread_result', False):
+                raise Error("unread result")
+            if connection.in_transaction:
+                connection.rollback()
+        except Error:
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    def connect(self, timeout=None):
+        """Borrows a connection wrapped so that close() releases it."""
+        return PooledConnection(self, self.acquire(timeout))
+
+    def stats(self):
+        """Gauges and counters describing the pool."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        return stats
+
+    def close(self):
+        """Closes every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(**overrides):
+    """
+    Returns the process-wide pool for the environment settings plus any
+    connect() overrides (e.g. database=None, allow_local_infile=True).
+    Each process gets its own pools, so forked workers never share sockets.
+    """
+    key = (os.getpid(), tuple(sorted(overrides.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            config = settings()
+            connect_kwargs = dict(config.pop('connect'), **overrides)
+            connect_kwargs = {name: value for name, value in
+                              connect_kwargs.items() if value is not None}
+            pool = _pools[key] = ConnectionPool(**config, **connect_kwargs)
+    return pool
+
+
+def connect(**overrides):
+    """Borrows a connection from the shared pool; close() gives it back."""
+    return get_pool(**overrides).connect()
@@ -2,18 +2,25 @@
 
 import os
 import csv
+import time
 import uuid
-import mysql.connector
+import queue
+import threading
+from collections import deque
+from decimal import Decimal, ROUND_HALF_UP
+from concurrent.futures import ProcessPoolExecutor
 from mysql.connector import Error
 
+import db_pool
+
+# Namespace for deterministic (UUIDv5) user ids.
+USER_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, 'user_data.ALX_prodev')
+KEY_MODES = ('random', 'email', 'content')
+
 def connect_db():
     """ Connect to MySQL database """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.'
-        )
+        connection = db_pool.connect(database=None)
         return connection
     except Error as e:
         print(f"Erro Connecting to MySQL: {e}")
@@ -30,15 +37,13 @@ def create_database(connection):
     finally:
         cursor.close()
 
-def connect_to_prodev():
+def connect_to_prodev(allow_local_infile=False):
     """ Connect to the ALX_prodev database """
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='alxprodev_user',
-            password='@1Suburban.',
-            database='ALX_prodev'
-        )
+        if allow_local_infile:
+            connection = db_pool.connect(allow_local_infile=True)
+        else:
+            connection = db_pool.connect()
         return connection
     except Error as e:
         print(f"Error connecting to ALX_prodev: {e}")
@@ -53,7 +58,8 @@ def create_table(connection):
             user_id VARCHAR(36) PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
             email VARCHAR(255) NOT NULL,
-            age DECIMAL NOT NULL
+            age DECIMAL NOT NULL,
+            INDEX idx_user_data_email (email)
         );
         """
         cursor.execute(create_table_query)
@@ -63,8 +69,33 @@ def create_table(connection):
     except Error as e:
         print(f"Error creating table: {e}")
 
-def insert_data(connection, filename):
+def normalize_age(age):
+    """Rounds an age the way the DECIMAL(10,0) age column stores it."""
+    return str(Decimal(str(age)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def make_user_id(row, key_mode='random'):
+    """
+    Returns the user_id for a CSV row.
+    'random' gives a new uuid4 every time. 'email' and 'content' give a
+    uuid5 derived from the email or from name/email/age, so the same row
+    always gets the same id and INSERT IGNORE can skip it on a reseed.
+    """
+    if key_mode == 'random':
+        return str(uuid.uuid4())
+    if key_mode == 'email':
+        return str(uuid.uuid5(USER_ID_NAMESPACE, row['email'].strip().lower()))
+    if key_mode == 'content':
+        content = '\x1f'.join(
+            (row['name'], row['email'], normalize_age(row['age'])))
+        return str(uuid.uuid5(USER_ID_NAMESPACE, content))
+    raise ValueError(f"Unknown key mode: {key_mode}")
+
+
+def insert_data(connection, filename, key_mode='random'):
     """Inserts data from CSV into the user_data table if not already inserted."""
+    if key_mode not in KEY_MODES:
+        raise ValueError(f"Unknown key mode: {key_mode}")
     try:
         cursor = connection.cursor()
         inserted_count = 0
@@ -76,7 +107,7 @@ def insert_data(connection, filename):
                 VALUES (%s, %s, %s, %s)
                 """
                 cursor.execute(query, (
-                    str(uuid.uuid4()),  # Generate a unique UUID for user_id
+                    make_user_id(row, key_mode),  # UUID for user_id
                     row['name'],
                     row['email'],
                     row['age']
@@ -89,3 +120,344 @@ def insert_data(connection, filename):
         print(f"Error inserting data: {e}")
     except FileNotFoundError:
         print(f"CSV file '{filename}' not found.")
+
+
+def read_csv_chunks(filename, chunk_size):
+    """Generator that yields lists of up to chunk_size CSV rows (dicts)."""
+    with open(filename, mode='r', encoding='utf-8') as file:
+        chunk = []
+        for row in csv.DictReader(file):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def local_infile_enabled(connection):
+    """True if the server accepts LOAD DATA LOCAL INFILE."""
+    cursor = connection.cursor()
+    cursor.execute("SHOW VARIABLES LIKE 'local_infile'")
+    row = cursor.fetchone()
+    cursor.close()
+    return bool(row) and str(row[1]).upper() == 'ON'
+
+
+def load_data_infile(connection, filename):
+    """
+    Loads the CSV in a single LOAD DATA LOCAL INFILE statement, letting
+    MySQL generate the UUIDs. Returns the number of rows loaded.
+    The connection must be opened with allow_local_infile=True.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE user_data "
+        "CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+        "LINES TERMINATED BY '\\n' IGNORE 1 LINES "
+        "(name, email, age) SET user_id = UUID()",
+        (os.path.abspath(filename),)
+    )
+    loaded = cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return loaded
+
+
+def bulk_insert_data(connection, filename, chunk_size=1000, progress=None,
+                     use_load_data=True, key_mode='random'):
+    """
+    Bulk-loads the CSV into user_data.
+
+    When use_load_data is set and both sides allow it, the file goes over
+    in one LOAD DATA LOCAL INFILE. Otherwise rows are sent chunk_size at a
+    time with executemany (which mysql-connector rewrites into one
+    multi-row INSERT) and committed per chunk. progress, if given, is
+    called with the running row count after every chunk.
+
+    LOAD DATA can only generate random ids, so it is skipped for the
+    deterministic key modes.
+    """
+    if key_mode not in KEY_MODES:
+        raise ValueError(f"Unknown key mode: {key_mode}")
+    try:
+        if (use_load_data and key_mode == 'random'
+                and local_infile_enabled(connection)):
+            try:
+                inserted_count = load_data_infile(connection, filename)
+                if progress:
+                    progress(inserted_count)
+                print(f"{inserted_count} rows inserted successfully.")
+                return inserted_count
+            except Error as e:
+                print(f"LOAD DATA unavailable, using executemany: {e}")
+
+        query = """
+        INSERT IGNORE INTO user_data (user_id, name, email, age)
+        VALUES (%s, %s, %s, %s)
+        """
+        cursor = connection.cursor()
+        inserted_count = 0
+        for chunk in read_csv_chunks(filename, chunk_size):
+            cursor.executemany(query, [
+                (make_user_id(row, key_mode), row['name'], row['email'],
+                 row['age'])
+                for row in chunk
+            ])
+            connection.commit()
+            inserted_count += len(chunk)
+            if progress:
+                progress(inserted_count)
+        cursor.close()
+        print(f"{inserted_count} rows inserted successfully.")
+        return inserted_count
+    except Error as e:
+        print(f"Error inserting data: {e}")
+    except FileNotFoundError:
+        print(f"CSV file '{filename}' not found.")
+    return 0
+
+
+def build_rows(chunk, key_mode='random'):
+    """
+    Turns CSV dict rows into user_data tuples with fresh UUIDs.
+    Runs in the worker processes of parallel_insert_data; returns the
+    rows and the seconds spent building them.
+    """
+    start = time.perf_counter()
+    rows = [(make_user_id(row, key_mode), row['name'], row['email'],
+             row['age'])
+            for row in chunk]
+    return rows, time.perf_counter() - start
+
+
+def parallel_insert_data(filename, chunk_size=5000, workers=None, writers=4,
+                         queue_size=8, key_mode='random'):
+    """
+    Pipelined CSV loader: one reader thread parses the CSV into chunks,
+    a pool of `workers` processes builds the rows, and `writers` threads,
+    each with its own connection, insert them with executemany.
+
+    Stages are joined by queues of at most queue_size chunks, so a slow
+    stage blocks the one before it instead of buffering the whole file.
+    Returns a dict with the row count and the seconds spent per stage.
+
+    Each writer holds a pooled connection, so writers may not exceed the
+    pool's MYSQL_POOL_MAX. If a writer cannot connect or an insert fails,
+    the pipeline stops and the first error is raised once every thread
+    has finished; a CSV read error is raised the same way.
+    """
+    if key_mode not in KEY_MODES:
+        raise ValueError(f"Unknown key mode: {key_mode}")
+    pool_max = db_pool.settings()['max_size']
+    if writers > pool_max:
+        raise ValueError(f"{writers} writers need {writers} connections but "
+                         f"the pool allows {pool_max} (MYSQL_POOL_MAX)")
+    raw_chunks = queue.Queue(maxsize=queue_size)
+    built_chunks = queue.Queue(maxsize=queue_size)
+    stats = {'rows': 0, 'read': 0.0, 'build': 0.0, 'insert': 0.0}
+    errors = []
+    failed = threading.Event()  # a writer gave up; stop feeding the rest
+    lock = threading.Lock()
+    done = object()
+
+    def reader():
+        start = time.perf_counter()
+        try:
+            for chunk in read_csv_chunks(filename, chunk_size):
+                stats['read'] += time.perf_counter() - start
+                raw_chunks.put(chunk)
+                start = time.perf_counter()
+        except (OSError, csv.Error) as e:
+            errors.append(e)
+        finally:
+            raw_chunks.put(done)
+
+    def writer():
+        connection = connect_to_prodev()
+        if connection is None:
+            errors.append(Error("writer could not connect to ALX_prodev"))
+            failed.set()
+            return  # don't take chunks we cannot insert
+        cursor = connection.cursor()
+        query = """
+        INSERT IGNORE INTO user_data (user_id, name, email, age)
+        VALUES (%s, %s, %s, %s)
+        """
+        try:
+            while True:
+                rows = built_chunks.get()
+                if rows is done:
+                    break
+                start = time.perf_counter()
+                try:
+                    cursor.executemany(query, rows)
+                    connection.commit()
+                except Error as e:
+                    errors.append(e)
+                    failed.set()
+                    return
+                with lock:
+                    stats['insert'] += time.perf_counter() - start
+                    stats['rows'] += len(rows)
+        finally:
+            cursor.close()
+            connection.close()
+
+    wall_start = time.perf_counter()
+    reader_thread = threading.Thread(target=reader)
+    writer_threads = [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in [reader_thread] + writer_threads:
+        thread.start()
+
+    def hand_off(item):
+        """Queues item for the writers; False once none is left to take it."""
+        while True:
+            try:
+                built_chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not any(t.is_alive() for t in writer_threads):
+                    return False
+
+    def build_done(future):
+        rows, seconds = future.result()
+        stats['build'] += seconds
+        hand_off(rows)
+
+    read_all = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            while not failed.is_set():
+                chunk = raw_chunks.get()
+                if chunk is done:
+                    read_all = True
+                    break
+                in_flight.append(pool.submit(build_rows, chunk, key_mode))
+                if len(in_flight) >= queue_size:
+                    build_done(in_flight.popleft())
+            while in_flight and not failed.is_set():
+                build_done(in_flight.popleft())
+            for future in in_flight:
+                future.cancel()
+    finally:
+        # Whatever happened, stop the writers and let the reader finish
+        # (it may be blocked on a full queue) so nothing hangs
+        if failed.is_set():
+            while True:  # drop chunks no one will insert
+                try:
+                    built_chunks.get_nowait()
+                except queue.Empty:
+                    break
+        for _ in writer_threads:
+            hand_off(done)
+        while not read_all:
+            read_all = raw_chunks.get() is done
+        for thread in [reader_thread] + writer_threads:
+            thread.join()
+    stats['wall'] = time.perf_counter() - wall_start
+
+    if errors:
+        # A partial load must not look like a finished one
+        for e in errors[1:]:
+            print(f"Error inserting data: {e}")
+        raise errors[0]
+    print(f"{stats['rows']} rows inserted in {stats['wall']:.2f}s "
+          f"(read {stats['read']:.2f}s, build {stats['build']:.2f}s, "
+          f"insert {stats['insert']:.2f}s across {writers} writers)")
+    return stats
+
+
+def ensure_email_index(connection):
+    """
+    Adds an index on user_data.email unless one exists, so sync_data can
+    look rows up by email. Tables made by older versions of create_table
+    lack it; building it is a one-off cost.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT 1 FROM information_schema.STATISTICS "
+                   "WHERE TABLE_SCHEMA = DATABASE() "
+                   "AND TABLE_NAME = 'user_data' AND COLUMN_NAME = 'email' "
+                   "AND SEQ_IN_INDEX = 1 LIMIT 1")
+    if cursor.fetchone() is None:
+        cursor.execute("ALTER TABLE user_data "
+                       "ADD INDEX idx_user_data_email (email)")
+    cursor.close()
+
+
+def stored_by_email(cursor, emails):
+    """
+    Maps each normalized email in `emails` that is already in user_data
+    to its stored (user_id, name, age).
+    """
+    if not emails:
+        return {}
+    placeholders = ', '.join(['%s'] * len(emails))
+    cursor.execute("SELECT user_id, name, email, age FROM user_data "
+                   f"WHERE email IN ({placeholders})", tuple(emails))
+    return {email.strip().lower(): (user_id, name, str(age))
+            for user_id, name, email, age in cursor.fetchall()}
+
+
+def sync_data(connection, filename, chunk_size=1000, progress=None,
+              key_mode='email'):
+    """
+    Incremental, idempotent reseed from the CSV.
+
+    Each chunk of CSV rows is matched with the stored rows by email (one
+    indexed lookup per chunk), so memory stays bounded by chunk_size and
+    rows are found whatever their user_id: tables seeded with random
+    uuid4 ids by insert_data are updated in place, not duplicated.
+    Unchanged rows are skipped, changed ones are upserted under their
+    existing user_id, and new ones are inserted with an email-derived id
+    (key_mode 'email'; 'content' ids would change with every edit, so
+    they are rejected). Returns (synced, unchanged) row counts.
+    """
+    if key_mode != 'email':
+        raise ValueError("sync_data needs key_mode='email', a key that "
+                         "stays the same when a row is edited")
+    query = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        name = VALUES(name), email = VALUES(email), age = VALUES(age)
+    """
+    try:
+        ensure_email_index(connection)
+        cursor = connection.cursor()
+        synced = unchanged = 0
+        for chunk in read_csv_chunks(filename, chunk_size):
+            emails = {row['email'].strip().lower() for row in chunk}
+            stored = stored_by_email(cursor, emails)
+            rows = []
+            for row in chunk:
+                email = row['email'].strip().lower()
+                match = stored.get(email)
+                if match is None:
+                    user_id = make_user_id(row, key_mode)
+                else:
+                    user_id, name, age = match
+                    if (name == row['name']
+                            and age == normalize_age(row['age'])):
+                        unchanged += 1
+                        continue
+                # Later duplicates of this email in the file update it
+                stored[email] = (user_id, row['name'],
+                                 normalize_age(row['age']))
+                rows.append((user_id, row['name'], row['email'], row['age']))
+            if rows:
+                cursor.executemany(query, rows)
+                connection.commit()
+                synced += len(rows)
+            if progress:
+                progress(synced + unchanged)
+        cursor.close()
+        print(f"{synced} rows synced, {unchanged} unchanged.")
+        return synced, unchanged
+    except Error as e:
+        print(f"Error syncing data: {e}")
+    except FileNotFoundError:
+        print(f"CSV file '{filename}' not found.")
+    return 0, 0